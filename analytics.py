@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import time
+
+from storage import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS video_stats_hourly (
+    hour INTEGER NOT NULL,
+    permanent_id INTEGER NOT NULL,
+    views INTEGER NOT NULL DEFAULT 0,
+    unlocks INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0,
+    replays INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (hour, permanent_id)
+);
+"""
+
+EVENTS = ("views", "unlocks", "failures", "replays")
+_EVENT_INDEX = {event: index for index, event in enumerate(EVENTS)}
+OTHER_ID = 0  # মেমরি সীমা ছাড়ালে নতুন ভিডিওগুলো এই বাকেটে জমা হয়
+
+
+# --- ভিডিও প্রতি ঘন্টাভিত্তিক অ্যানালিটিক্স ---
+class Analytics:
+    """ক্লিক ইভেন্ট মেমরিতে (ঘন্টা, পার্মানেন্ট ID) অনুযায়ী গুনে রাখে; নির্দিষ্ট বিরতিতে SQLite এ যোগ করে লেখে"""
+
+    def __init__(self, path, flush_interval=60.0, max_keys=50000, retention_days=90):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_keys = max_keys  # ফ্লাশের আগে মেমরিতে সর্বোচ্চ (ঘন্টা, ID) কী
+        self.retention_days = retention_days
+        self.overflowed = 0
+        self.conn = None
+        self._pending = {}  # (hour, permanent_id) -> [views, unlocks, failures, replays]
+        self._wakeup = None
+        self._flush_task = None
+
+    def open(self):
+        self.conn = connect_sqlite(self.path)
+        self.conn.executescript(ANALYTICS_SCHEMA)
+        return self
+
+    def record(self, permanent_id, event):
+        """হট পাথ: শুধু একটি dict আপডেট, কোনো I/O নয়"""
+        key = (int(time.time() // 3600), int(permanent_id))
+        counts = self._pending.get(key)
+        if counts is None:
+            if len(self._pending) >= self.max_keys:
+                # স্পাইকের সময় মেমরি সীমিত রাখতে আগেভাগে ফ্লাশ; ততক্ষণ "অন্যান্য" বাকেটে গোনা
+                self.overflowed += 1
+                if self._wakeup is not None:
+                    self._wakeup.set()
+                key = (key[0], OTHER_ID)
+                counts = self._pending.get(key)
+            if counts is None:
+                counts = self._pending[key] = [0, 0, 0, 0]
+        counts[_EVENT_INDEX[event]] += 1
+
+    def pending(self):
+        return len(self._pending)
+
+    def flush(self):
+        """জমা কাউন্টারগুলো একটি ট্রানজ্যাকশনে ডিস্কে যোগ করে; কতগুলো সারি লেখা হলো তা ফেরত দেয়"""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        rows = [(hour, permanent_id, *counts) for (hour, permanent_id), counts in pending.items()]
+        cutoff = int(time.time() // 3600) - self.retention_days * 24
+        try:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT INTO video_stats_hourly (hour, permanent_id, views, unlocks, failures, replays) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (hour, permanent_id) DO UPDATE SET "
+                "views = views + excluded.views, unlocks = unlocks + excluded.unlocks, "
+                "failures = failures + excluded.failures, replays = replays + excluded.replays",
+                rows,
+            )
+            self.conn.execute("DELETE FROM video_stats_hourly WHERE hour < ?", (cutoff,))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            # পরের ফ্লাশে আবার চেষ্টা হবে
+            for key, counts in pending.items():
+                merged = self._pending.setdefault(key, [0, 0, 0, 0])
+                for index, value in enumerate(counts):
+                    merged[index] += value
+            raise
+        return len(rows)
+
+    # --- রিপোর্ট (শুধু ঘন্টাভিত্তিক সারাংশ থেকে) ---
+    def summary(self, hours=24, limit=10):
+        """(মোট [views, unlocks, failures, replays], টপ ভিডিও [(id, views, unlocks, failures, replays)])"""
+        self.flush()
+        since = int(time.time() // 3600) - hours + 1
+        totals = self.conn.execute(
+            "SELECT COALESCE(SUM(views), 0), COALESCE(SUM(unlocks), 0), COALESCE(SUM(failures), 0), "
+            "COALESCE(SUM(replays), 0) FROM video_stats_hourly WHERE hour >= ?", (since,)
+        ).fetchone()
+        top = self.conn.execute(
+            "SELECT permanent_id, SUM(views) AS v, SUM(unlocks), SUM(failures), SUM(replays) "
+            "FROM video_stats_hourly WHERE hour >= ? AND permanent_id != ? "
+            "GROUP BY permanent_id ORDER BY v DESC, permanent_id LIMIT ?", (since, OTHER_ID, limit)
+        ).fetchall()
+        return list(totals), top
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"অ্যানালিটিক্স সেভ করতে ব্যর্থ: {e}")
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"অ্যানালিটিক্স সেভ করতে ব্যর্থ: {e}")
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
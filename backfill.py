@@ -0,0 +1,241 @@
+import asyncio
+import functools
+import logging
+import time
+from itertools import islice
+
+from telegram.error import BadRequest, TelegramError
+
+from sender import PRIORITY_BACKFILL
+from storage import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS channel_posts (
+    permanent_id INTEGER NOT NULL,
+    chat_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    posted_at REAL NOT NULL,
+    PRIMARY KEY (permanent_id, chat_id)
+);
+CREATE TABLE IF NOT EXISTS backfill_jobs (
+    name TEXT PRIMARY KEY,
+    mode TEXT NOT NULL,
+    channel_id INTEGER NOT NULL,
+    last_id INTEGER NOT NULL DEFAULT 0,
+    done INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+"""
+
+BACKFILL_MODES = ("edit", "repost")
+
+
+# --- চ্যানেল পোস্ট ইনডেক্স ও ব্যাকফিল চেকপয়েন্ট ---
+class ChannelPostStore:
+    """কোন পার্মানেন্ট ID কোন চ্যানেলে কোন মেসেজ হিসেবে পোস্ট হয়েছে, আর ব্যাকফিল জবের অগ্রগতি"""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = None
+
+    def open(self):
+        self.conn = connect_sqlite(self.path)
+        self.conn.executescript(BACKFILL_SCHEMA)
+        return self
+
+    def record_post(self, permanent_id, chat_id, message_id):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO channel_posts (permanent_id, chat_id, message_id, posted_at) VALUES (?, ?, ?, ?)",
+            (int(permanent_id), chat_id, message_id, time.time()),
+        )
+
+    def post_for(self, permanent_id, chat_id):
+        """চ্যানেলে পোস্টের মেসেজ ID, জানা না থাকলে None"""
+        row = self.conn.execute(
+            "SELECT message_id FROM channel_posts WHERE permanent_id = ? AND chat_id = ?", (int(permanent_id), chat_id)
+        ).fetchone()
+        return row[0] if row else None
+
+    def load_job(self, name):
+        row = self.conn.execute(
+            "SELECT name, mode, channel_id, last_id, done, skipped, failed, started_at, finished_at "
+            "FROM backfill_jobs WHERE name = ?", (name,)
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ("name", "mode", "channel_id", "last_id", "done", "skipped", "failed", "started_at", "finished_at")
+        return dict(zip(keys, row))
+
+    def save_job(self, state):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO backfill_jobs "
+            "(name, mode, channel_id, last_id, done, skipped, failed, started_at, finished_at) "
+            "VALUES (:name, :mode, :channel_id, :last_id, :done, :skipped, :failed, :started_at, :finished_at)",
+            state,
+        )
+
+    def unfinished_jobs(self):
+        rows = self.conn.execute("SELECT name FROM backfill_jobs WHERE finished_at IS NULL").fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}ঘ {minutes}মি"
+    if minutes:
+        return f"{minutes}মি {seconds}সে"
+    return f"{seconds}সে"
+
+
+# --- বাল্ক রিপোস্ট/এডিট জব ---
+class BackfillJob:
+    """ক্যাটালগ ID ক্রমে স্ট্রিম করে প্রতিটি পোস্টের লিংক/কিবোর্ড নতুন করে বানায় এবং চ্যানেলে এডিট বা রিপোস্ট করে
+
+    edit: জানা চ্যানেল পোস্টের কিবোর্ড বদলায় (নতুন BOT_USERNAME)।
+    repost: যে পোস্ট এই চ্যানেলে এখনও নেই তা নতুন করে পোস্ট করে (নতুন CHANNEL_ID)।
+    প্রতিটি ব্যাচের পর চেকপয়েন্ট লেখা হয়; একই name দিয়ে আবার চালালে সেখান থেকে শুরু হয়।
+    """
+
+    def __init__(self, name, mode, channel_id, catalog, store, sender, bot, build_post, report=None,
+                 batch_size=20, window=2, report_interval=30.0):
+        if mode not in BACKFILL_MODES:
+            raise ValueError(f"অজানা ব্যাকফিল মোড: {mode}")
+        self.name = name
+        self.mode = mode
+        self.channel_id = channel_id
+        self.catalog = catalog
+        self.store = store
+        self.sender = sender
+        self.bot = bot
+        self.build_post = build_post  # (permanent_id, record) -> (caption, keyboard)
+        self.report = report  # async (text), অগ্রগতি জানানোর জন্য
+        self.batch_size = batch_size
+        # একই চ্যানেলের কল সেন্ডারে এমনিতেই সিরিয়াল হয়; ছোট window রাখলে সেন্ড ওয়ার্কার আটকে থাকে না
+        self.window = window
+        self.report_interval = report_interval
+        self.state = None
+        self.total = 0
+        self._run_started = None
+        self._run_count = 0
+
+    # --- অগ্রগতি ---
+    def progress_text(self):
+        state = self.state
+        if state is None:
+            return "ব্যাকফিল এখনও শুরু হয়নি।"
+        handled = state["done"] + state["skipped"] + state["failed"]
+        elapsed = time.monotonic() - self._run_started if self._run_started else 0.0
+        rate = self._run_count / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total - handled, 0)
+        eta = format_duration(remaining / rate) if rate > 0 else "—"
+        status = "✅ শেষ" if state["finished_at"] else "⏳ চলছে"
+        return (
+            f"🔁 ব্যাকফিল ({self.mode}, চ্যানেল {self.channel_id}) {status}\n"
+            f"অগ্রগতি: {handled} / {self.total} (শেষ ID {state['last_id']})\n"
+            f"সফল: {state['done']}, বাদ: {state['skipped']}, ব্যর্থ: {state['failed']}\n"
+            f"গতি: {rate:.2f}/সে, বাকি সময়: {eta}"
+        )
+
+    async def _report(self):
+        if self.report is None:
+            return
+        try:
+            await self.report(self.progress_text())
+        except Exception as e:
+            logger.warning(f"ব্যাকফিল অগ্রগতি জানাতে ব্যর্থ: {e}")
+
+    def _record_sent(self, permanent_id, future):
+        if not future.cancelled() and future.exception() is None:
+            self.store.record_post(permanent_id, self.channel_id, future.result().message_id)
+
+    # --- একটি পোস্ট ---
+    async def _process(self, permanent_id, record):
+        """'done', 'skipped' অথবা 'failed' ফেরত দেয়"""
+        caption, keyboard = self.build_post(permanent_id, record)
+        message_id = self.store.post_for(permanent_id, self.channel_id)
+        try:
+            if self.mode == "edit":
+                if message_id is None:
+                    # বট চ্যানেলের পুরনো মেসেজ খুঁজে পায় না; এগুলোর জন্য repost লাগবে
+                    return "skipped"
+                await self.sender.run(
+                    PRIORITY_BACKFILL, self.channel_id, self.bot.edit_message_reply_markup,
+                    chat_id=self.channel_id, message_id=message_id, reply_markup=keyboard,
+                )
+            else:
+                if message_id is not None:
+                    return "skipped"
+                future = self.sender.submit(
+                    PRIORITY_BACKFILL, self.channel_id, self.bot.send_photo,
+                    chat_id=self.channel_id, photo=record["photo_id"], caption=caption, reply_markup=keyboard,
+                )
+                # জব থামানো হলেও ইতিমধ্যে রওনা হওয়া পোস্ট রেকর্ড হয়, যাতে আবার চালালে ডুপ্লিকেট না হয়
+                future.add_done_callback(functools.partial(self._record_sent, permanent_id))
+                await asyncio.shield(future)
+        except BadRequest as e:
+            if "not modified" in str(e).lower():
+                return "done"
+            logger.warning(f"ব্যাকফিল: ID {permanent_id} প্রসেস করা যায়নি: {e}")
+            return "failed"
+        except TelegramError as e:
+            logger.warning(f"ব্যাকফিল: ID {permanent_id} প্রসেস করা যায়নি: {e}")
+            return "failed"
+        return "done"
+
+    async def run(self):
+        state = self.store.load_job(self.name)
+        if state is None or state["finished_at"]:
+            state = {
+                "name": self.name, "mode": self.mode, "channel_id": self.channel_id, "last_id": 0,
+                "done": 0, "skipped": 0, "failed": 0, "started_at": time.time(), "finished_at": None,
+            }
+            self.store.save_job(state)
+        elif state["last_id"]:
+            logger.info(f"ব্যাকফিল {self.name} আগের চেকপয়েন্ট থেকে চলছে: ID {state['last_id']} এর পর থেকে")
+        self.state = state
+        self.total = len(self.catalog)
+        self._run_started = time.monotonic()
+        self._run_count = 0
+        await self._report()
+
+        slots = asyncio.Semaphore(self.window)
+
+        async def process_with_slot(permanent_id, record):
+            async with slots:
+                return await self._process(permanent_id, record)
+
+        records = self.catalog.iter_records(after_id=state["last_id"], batch_size=max(self.batch_size, 100))
+        last_report = time.monotonic()
+        while True:
+            batch = list(islice(records, self.batch_size))
+            if not batch:
+                break
+            outcomes = await asyncio.gather(*(process_with_slot(pid, record) for pid, record in batch))
+            for outcome in outcomes:
+                state[outcome] += 1
+            state["last_id"] = int(batch[-1][0])
+            self._run_count += len(batch)
+            self.store.save_job(state)
+            if time.monotonic() - last_report >= self.report_interval:
+                last_report = time.monotonic()
+                logger.info(self.progress_text().replace("\n", " | "))
+                await self._report()
+
+        state["finished_at"] = time.time()
+        self.store.save_job(state)
+        logger.info(self.progress_text().replace("\n", " | "))
+        await self._report()
+        return state
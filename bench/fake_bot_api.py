@@ -0,0 +1,214 @@
+"""লোকাল নকল Telegram Bot API সার্ভার (বেঞ্চমার্কের জন্য)
+
+sendMessage, sendPhoto, sendVideo, sendMediaGroup, deleteMessage(s), getMe, getUpdates
+ইত্যাদি মেথডের জবাব দেয়। লেটেন্সি ও 429 (RetryAfter) ইনজেকশন কনফিগার করা যায়।
+
+আলাদাভাবে চালানো:
+    python bench/fake_bot_api.py --port 8081 --latency-ms 30 --flood-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+
+import tornado.httpserver
+import tornado.log
+import tornado.netutil
+import tornado.web
+
+BOT_USER = {"id": 999000, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+
+
+class FakeBotApi:
+    """প্রতিটি কলের জন্য কনফিগার করা লেটেন্সি দেয় এবং flood_rate সম্ভাবনায় 429 ফেরত দেয়"""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, flood_rate=0.0, retry_after=1, seed=None):
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.flood_rate = flood_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.calls = Counter()
+        self.floods = Counter()
+        self.messages_sent = 0
+        self.messages_deleted = 0
+        self.updates = None
+        self._message_id = 0
+        self._server = None
+        self.port = None
+
+    # --- জবাব তৈরি ---
+    def _message(self, chat_id, **extra):
+        self._message_id += 1
+        self.messages_sent += 1
+        chat_type = "private" if chat_id > 0 else "channel"
+        message = {"message_id": self._message_id, "date": int(time.time()), "chat": {"id": chat_id, "type": chat_type}}
+        message.update(extra)
+        return message
+
+    @staticmethod
+    def _chat_id(params):
+        return int(params.get("chat_id", 0))
+
+    async def handle(self, method, params):
+        """একটি Bot API মেথডের পুরো JSON জবাব ফেরত দেয় (ok/result অথবা 429 error)"""
+        self.calls[method] += 1
+        if method == "getUpdates":
+            return await self._get_updates(params)
+
+        delay = self.latency + (self.random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if method != "getMe" and self.flood_rate and self.random.random() < self.flood_rate:
+            self.floods[method] += 1
+            return {
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after}",
+                "parameters": {"retry_after": self.retry_after},
+            }
+
+        if method == "getMe":
+            result = BOT_USER
+        elif method in ("sendMessage", "sendPhoto", "sendVideo"):
+            result = self._message(self._chat_id(params))
+        elif method == "sendMediaGroup":
+            media = json.loads(params.get("media", "[]"))
+            chat_id = self._chat_id(params)
+            group_id = str(self._message_id + 1)
+            result = [self._message(chat_id, media_group_id=group_id) for _ in media]
+        elif method == "deleteMessage":
+            self.messages_deleted += 1
+            result = True
+        elif method == "deleteMessages":
+            self.messages_deleted += len(json.loads(params.get("message_ids", "[]")))
+            result = True
+        elif method in ("editMessageReplyMarkup", "editMessageCaption"):
+            result = self._message(self._chat_id(params))
+        else:
+            # setWebhook, deleteWebhook, forwardMessage ইত্যাদি
+            result = True
+        return {"ok": True, "result": result}
+
+    async def _get_updates(self, params):
+        timeout = float(params.get("timeout", 0) or 0)
+        limit = int(params.get("limit", 100) or 100)
+        batch = []
+        try:
+            batch.append(await asyncio.wait_for(self.updates.get(), timeout=max(timeout, 0.01)))
+        except asyncio.TimeoutError:
+            return {"ok": True, "result": []}
+        while len(batch) < limit and not self.updates.empty():
+            batch.append(self.updates.get_nowait())
+        return {"ok": True, "result": batch}
+
+    def push_update(self, update):
+        """getUpdates এর মাধ্যমে বটকে দেওয়ার জন্য একটি আপডেট (dict) কিউতে রাখে"""
+        self.updates.put_nowait(update)
+
+    def stats(self):
+        return {
+            "calls": dict(self.calls),
+            "floods_injected": dict(self.floods),
+            "messages_sent": self.messages_sent,
+            "messages_deleted": self.messages_deleted,
+        }
+
+    # --- সার্ভার ---
+    async def start(self, host="127.0.0.1", port=0):
+        """চলমান ইভেন্ট লুপে সার্ভার চালু করে পোর্ট ফেরত দেয়"""
+        self.updates = asyncio.Queue()
+        app = tornado.web.Application([
+            (r"/bot[^/]+/(\w+)", _MethodHandler, {"api": self}),
+            (r"/stats", _StatsHandler, {"api": self}),
+            (r"/updates", _UpdatesHandler, {"api": self}),
+        ])
+        self._server = tornado.httpserver.HTTPServer(app)
+        sockets = tornado.netutil.bind_sockets(port, host)
+        self._server.add_sockets(sockets)
+        self.port = sockets[0].getsockname()[1]
+        return self.port
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}/bot"
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.stop()
+            await self._server.close_all_connections()
+            self._server = None
+
+
+class _MethodHandler(tornado.web.RequestHandler):
+    def initialize(self, api):
+        self.api = api
+
+    async def post(self, method):
+        params = {key: values[-1].decode("utf-8") for key, values in self.request.body_arguments.items()}
+        if not params and self.request.body and self.request.headers.get("Content-Type", "").startswith("application/json"):
+            params = {key: value if isinstance(value, str) else json.dumps(value)
+                      for key, value in json.loads(self.request.body).items()}
+        response = await self.api.handle(method, params)
+        self.set_header("Content-Type", "application/json")
+        if not response.get("ok"):
+            self.set_status(response.get("error_code", 400))
+        self.finish(json.dumps(response))
+
+    get = post
+
+
+class _StatsHandler(tornado.web.RequestHandler):
+    """আলাদা প্রসেসে চালালে লোড জেনারেটর এখান থেকে কল-পরিসংখ্যান নেয়"""
+
+    def initialize(self, api):
+        self.api = api
+
+    def get(self):
+        self.set_header("Content-Type", "application/json")
+        self.finish(json.dumps(self.api.stats()))
+
+
+class _UpdatesHandler(tornado.web.RequestHandler):
+    """আলাদা প্রসেসে চালালে লোড জেনারেটর এখানে আপডেটের JSON তালিকা POST করে getUpdates কিউতে দেয়"""
+
+    def initialize(self, api):
+        self.api = api
+
+    def post(self):
+        updates = json.loads(self.request.body)
+        for update in updates:
+            self.api.push_update(update)
+        self.set_header("Content-Type", "application/json")
+        self.finish(json.dumps({"queued": len(updates)}))
+
+
+async def _serve(args):
+    api = FakeBotApi(args.latency_ms, args.jitter_ms, args.flood_rate, args.retry_after)
+    port = await api.start(args.host, args.port)
+    print(f"নকল Bot API চালু: http://{args.host}:{port}/bot<TOKEN>/<method>", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await api.stop()
+        print(api.stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="লোকাল নকল Telegram Bot API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--flood-rate", type=float, default=0.0, help="প্রতি কলে 429 ফেরত দেওয়ার সম্ভাবনা")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--access-log", action="store_true", help="প্রতিটি রিকোয়েস্ট লগ করা")
+    cli_args = parser.parse_args()
+    if cli_args.access_log:
+        tornado.log.enable_pretty_logging()
+    try:
+        asyncio.run(_serve(cli_args))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,372 @@
+"""/start ডেলিভারি পাথের লোড টেস্ট
+
+নকল Bot API (bench/fake_bot_api.py) চালু করে main.py এর আসল হ্যান্ডলার ও সার্ভিসগুলোর উপর
+সিনথেটিক `/start <টোকেন>` (দেখা/আনলক, ঐচ্ছিকভাবে জাল টোকেন) ক্লিক এবং এডমিন আপলোড সিকোয়েন্স চালায়।
+থ্রুপুট, লেটেন্সি পার্সেন্টাইল, API কল সংখ্যা ও মেমরি বৃদ্ধি রিপোর্ট করে।
+
+উদাহরণ:
+    python bench/load_test.py --clicks 5000 --users 2000 --api-latency-ms 20
+    python bench/load_test.py --flood-rate 0.02 --json bench_result.json
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ADMIN_ID = 1
+CHANNEL = -1001234567890
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeServerProcess:
+    """নকল Bot API আলাদা প্রসেসে চালায়, যাতে সার্ভারের CPU খরচ বটের মাপের সাথে না মেশে"""
+
+    def __init__(self, args):
+        self.args = args
+        self.port = free_port()
+        self.process = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}/bot"
+
+    async def start(self):
+        self.process = subprocess.Popen([
+            sys.executable, os.path.join(ROOT, "bench", "fake_bot_api.py"),
+            "--port", str(self.port),
+            "--latency-ms", str(self.args.api_latency_ms),
+            "--jitter-ms", str(self.args.api_jitter_ms),
+            "--flood-rate", str(self.args.flood_rate),
+            "--retry-after", str(self.args.retry_after),
+        ], stdout=subprocess.DEVNULL)
+        for _ in range(100):
+            try:
+                _, writer = await asyncio.open_connection("127.0.0.1", self.port)
+                writer.close()
+                return
+            except OSError:
+                await asyncio.sleep(0.05)
+        raise RuntimeError("নকল Bot API সার্ভার চালু হয়নি")
+
+    async def stats(self):
+        import httpx
+
+        async with httpx.AsyncClient() as client:
+            response = await client.get(f"http://127.0.0.1:{self.port}/stats")
+            return response.json()
+
+    async def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait(timeout=10)
+
+
+class InProcessServer:
+    """একই ইভেন্ট লুপে নকল সার্ভার (সহজ ডিবাগিংয়ের জন্য)"""
+
+    def __init__(self, args):
+        from bench.fake_bot_api import FakeBotApi
+
+        self.api = FakeBotApi(args.api_latency_ms, args.api_jitter_ms, args.flood_rate, args.retry_after, seed=args.seed)
+
+    @property
+    def base_url(self):
+        return self.api.base_url
+
+    async def start(self):
+        await self.api.start()
+
+    async def stats(self):
+        return self.api.stats()
+
+    async def stop(self):
+        await self.api.stop()
+
+
+def configure_environment(args, workdir):
+    """main ইমপোর্ট করার আগে বেঞ্চমার্কের জন্য কনফিগারেশন সেট করে"""
+    os.environ.update({
+        "BOT_TOKEN": "123456:BENCH",
+        "ADMIN_USER_ID": str(ADMIN_ID),
+        "CHANNEL_ID": str(CHANNEL),
+        "AD_URL": "https://example.com/ad",
+        "BOT_USERNAME": "bench_bot",
+        "LINK_SECRET": "load-bench-secret",
+        "DATA_FILE": os.path.join(workdir, "video_data.json"),
+        "CATALOG_DB_FILE": os.path.join(workdir, "video_data.db"),
+        "CATALOG_BACKEND": args.backend,
+        "DELETION_DB_FILE": os.path.join(workdir, "deletions.db"),
+        "SESSION_DB_FILE": os.path.join(workdir, "sessions.db"),
+        "CHANNEL_POSTS_DB_FILE": os.path.join(workdir, "channel_posts.db"),
+        "ANALYTICS_DB_FILE": os.path.join(workdir, "analytics.db"),
+        "SEND_RATE_PER_SECOND": str(args.send_rate),
+        "SEND_PRIVATE_CHAT_INTERVAL": str(args.chat_interval),
+        "SEND_WORKERS": str(args.send_workers),
+        "UPDATE_CONCURRENCY": str(args.concurrency),
+        "UPDATE_QUEUE_SIZE": str(args.queue_size),
+    })
+
+
+# --- সিনথেটিক আপডেট ---
+class UpdateFactory:
+    def __init__(self):
+        self.update_id = 0
+
+    def _message(self, user_id, **fields):
+        self.update_id += 1
+        message = {
+            "message_id": self.update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"u{user_id}"},
+        }
+        message.update(fields)
+        return {"update_id": self.update_id, "message": message}
+
+    def command(self, user_id, text):
+        command = text.split()[0]
+        return self._message(user_id, text=text, entities=[{"type": "bot_command", "offset": 0, "length": len(command)}])
+
+    def photo(self, user_id, file_id):
+        return self._message(user_id, photo=[{"file_id": file_id, "file_unique_id": file_id, "width": 90, "height": 90}])
+
+    def video(self, user_id, file_id):
+        return self._message(user_id, video={"file_id": file_id, "file_unique_id": file_id, "width": 640, "height": 360, "duration": 10})
+
+
+def build_workload(args, factory, permanent_ids, codec):
+    """ক্লিক (জনপ্রিয় পোস্টে বেশি ট্রাফিক) ও এডমিন আপলোড মিশিয়ে আপডেট তালিকা তৈরি করে"""
+    rng = random.Random(args.seed)
+    # zipf-এর মতো বিতরণ: কয়েকটি ভাইরাল পোস্টে বেশিরভাগ ক্লিক
+    weights = [1.0 / (rank + 1) for rank in range(len(permanent_ids))]
+    from tokens import ACTION_UNLOCK, ACTION_VIEW, LinkTokenCodec
+
+    forger = LinkTokenCodec("not-the-bot-secret")
+    # বটের মতোই: আনলক লিংক প্রতিটি ইউজারের জন্য আলাদা, একই ইউজার বারবার ক্লিক করলে ক্যাশ hit
+    unlock_expires_at = int(time.time()) + 3600
+    updates = []
+    for _ in range(args.clicks):
+        user_id = 10_000 + rng.randrange(args.users)
+        if rng.random() < args.forged_ratio:
+            # ভুল সিক্রেটে সাইন করা, অনুমান করা ID: ক্যাটালগ/API তে পৌঁছানোর আগেই বাতিল হওয়ার কথা
+            token = forger.encode(ACTION_UNLOCK, rng.randrange(1, 1_000_000), user_id=user_id)
+            updates.append(("forged", factory.command(user_id, f"/start {token}")))
+            continue
+        permanent_id = rng.choices(permanent_ids, weights)[0]
+        if rng.random() < args.unlock_ratio:
+            token = codec.encode(ACTION_UNLOCK, permanent_id, expires_at=unlock_expires_at, user_id=user_id)
+        else:
+            token = codec.encode(ACTION_VIEW, permanent_id)
+        updates.append(("click", factory.command(user_id, f"/start {token}")))
+
+    admin_sequences = []
+    for upload in range(args.admin_uploads):
+        sequence = [factory.command(ADMIN_ID, f"/start_upload_{args.videos_per_post}"),
+                    factory.photo(ADMIN_ID, f"bench-photo-{upload}")]
+        sequence += [factory.video(ADMIN_ID, f"bench-video-{upload}-{i}") for i in range(args.videos_per_post)]
+        admin_sequences.append(sequence)
+
+    # এডমিন সিকোয়েন্সগুলো ক্রম ঠিক রেখে ক্লিকের মাঝে ছড়িয়ে দেওয়া হয়
+    admin_updates = [update for sequence in admin_sequences for update in sequence]
+    if admin_updates:
+        step = max(1, len(updates) // (len(admin_updates) + 1))
+        for position, update in enumerate(admin_updates):
+            updates.insert(min(len(updates), (position + 1) * step + position), ("admin", update))
+    return updates
+
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    configure_environment(args, workdir)
+
+    from telegram import Update
+    from telegram.ext import Application, TypeHandler
+
+    import main
+
+    main.logger.setLevel(args.log_level)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    api = InProcessServer(args) if args.in_process_server else FakeServerProcess(args)
+    await api.start()
+
+    main.init_services()
+    permanent_ids = [
+        main.CATALOG.add({"video_ids": [f"seed-video-{post}-{i}" for i in range(args.videos_per_post)],
+                          "photo_id": f"seed-photo-{post}"})
+        for post in range(args.posts)
+    ]
+
+    builder = Application.builder().base_url(api.base_url).base_file_url(api.base_url)
+    application = main.build_application(builder)
+
+    started_at = {}
+    latencies = {"click": [], "forged": [], "admin": []}
+    kinds = {}
+    done = asyncio.Event()
+    remaining = {"count": 0}
+
+    async def record_done(update, context):
+        began = started_at.pop(update.update_id, None)
+        if began is not None:
+            latencies[kinds.pop(update.update_id)].append(time.perf_counter() - began)
+        remaining["count"] -= 1
+        if remaining["count"] <= 0:
+            done.set()
+
+    # গ্রুপ 1: আসল হ্যান্ডলার (গ্রুপ 0) শেষ হওয়ার পর লেটেন্সি রেকর্ড
+    application.add_handler(TypeHandler(Update, record_done), group=1)
+
+    factory = UpdateFactory()
+    workload = build_workload(args, factory, permanent_ids, main.LINK_CODEC)
+    remaining["count"] = len(workload)
+
+    await application.initialize()
+    await main.on_startup(application)
+    await application.start()
+
+    # tracemalloc সবকিছু কয়েক গুণ ধীর করে, তাই শুধু চাইলে চালু হয়
+    if args.trace_memory:
+        tracemalloc.start()
+    gc_objects_before = len(gc.get_objects())
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    interval = 1.0 / args.rate if args.rate else 0.0
+    bench_start = time.perf_counter()
+    for kind, data in workload:
+        update = Update.de_json(data, application.bot)
+        kinds[update.update_id] = kind
+        started_at[update.update_id] = time.perf_counter()
+        # সীমিত আপডেট কিউ পূর্ণ হলে এখানে ব্যাকপ্রেশার তৈরি হয়
+        await application.update_queue.put(update)
+        if interval:
+            await asyncio.sleep(interval)
+
+    timed_out = False
+    try:
+        await asyncio.wait_for(done.wait(), timeout=args.timeout)
+    except asyncio.TimeoutError:
+        timed_out = True
+    elapsed = time.perf_counter() - bench_start
+
+    memory = {"gc_objects_growth": len(gc.get_objects()) - gc_objects_before}
+    if args.trace_memory:
+        memory_current, memory_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memory["traced_kb"] = round(memory_current / 1024, 1)
+        memory["traced_peak_kb"] = round(memory_peak / 1024, 1)
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    result = {
+        "config": vars(args),
+        "updates": len(workload),
+        "completed": len(workload) - max(remaining["count"], 0),
+        "timed_out": timed_out,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round((len(workload) - max(remaining["count"], 0)) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {},
+        "memory": dict(memory, max_rss_growth_kb=rss_after - rss_before),
+        "pending_deletions": main.DELETIONS.depth(),
+        "send_queue_depth": main.SENDER.depth(),
+        "link_cache": main.LINK_CACHE.stats(),
+        "api": await api.stats(),
+    }
+    for kind, values in latencies.items():
+        values.sort()
+        result["latency_ms"][kind] = {
+            "count": len(values),
+            "p50": round(percentile(values, 50) * 1000, 2),
+            "p90": round(percentile(values, 90) * 1000, 2),
+            "p99": round(percentile(values, 99) * 1000, 2),
+            "max": round((values[-1] if values else 0.0) * 1000, 2),
+        }
+
+    await application.stop()
+    await main.on_stop(application)
+    await application.shutdown()
+    await main.on_shutdown(application)
+    await api.stop()
+    return result
+
+
+def print_report(result):
+    print(f"আপডেট: {result['completed']}/{result['updates']}  সময়: {result['elapsed_seconds']}s  "
+          f"থ্রুপুট: {result['throughput_per_second']}/s" + ("  (টাইমআউট!)" if result["timed_out"] else ""))
+    for kind, stats in result["latency_ms"].items():
+        print(f"  {kind:<6} n={stats['count']:<6} p50={stats['p50']}ms p90={stats['p90']}ms "
+              f"p99={stats['p99']}ms max={stats['max']}ms")
+    memory = result["memory"]
+    traced = f", traced {memory['traced_kb']}KB (peak {memory['traced_peak_kb']}KB)" if "traced_kb" in memory else ""
+    print(f"মেমরি: max RSS +{memory['max_rss_growth_kb']}KB, gc অবজেক্ট +{memory['gc_objects_growth']}{traced}")
+    print(f"অপেক্ষমাণ ডিলিট: {result['pending_deletions']}  সেন্ড কিউ: {result['send_queue_depth']}  "
+          f"লিংক ক্যাশ: {result['link_cache']}")
+    print(f"API কল: {result['api']['calls']}  429 ইনজেক্ট: {result['api']['floods_injected']}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="/start ডেলিভারি পাথের লোড টেস্ট")
+    parser.add_argument("--clicks", type=int, default=2000, help="মোট deep-link ক্লিক")
+    parser.add_argument("--users", type=int, default=1000, help="ভিন্ন ইউজার সংখ্যা")
+    parser.add_argument("--posts", type=int, default=50, help="ক্যাটালগে আগে থেকে থাকা পোস্ট")
+    parser.add_argument("--videos-per-post", type=int, default=3)
+    parser.add_argument("--unlock-ratio", type=float, default=0.5, help="আনলক ক্লিকের অনুপাত")
+    parser.add_argument("--forged-ratio", type=float, default=0.0, help="জাল টোকেন দিয়ে ক্লিকের অনুপাত")
+    parser.add_argument("--admin-uploads", type=int, default=3, help="ক্লিকের মাঝে এডমিন আপলোড সিকোয়েন্স")
+    parser.add_argument("--rate", type=float, default=0.0, help="প্রতি সেকেন্ডে অফার করা আপডেট (0 = একসাথে বার্স্ট)")
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--queue-size", type=int, default=1000)
+    parser.add_argument("--send-rate", type=float, default=1000.0,
+                        help="সেন্ড শিডিউলারের গ্লোবাল রেট (প্রোডাকশনের মতো মাপতে 30 দিন)")
+    parser.add_argument("--send-workers", type=int, default=16, help="সেন্ড শিডিউলারের ওয়ার্কার সংখ্যা")
+    parser.add_argument("--chat-interval", type=float, default=0.0, help="প্রাইভেট চ্যাটে মেসেজের ন্যূনতম ব্যবধান")
+    parser.add_argument("--api-latency-ms", type=float, default=5.0)
+    parser.add_argument("--api-jitter-ms", type=float, default=2.0)
+    parser.add_argument("--flood-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--in-process-server", action="store_true", help="নকল সার্ভার একই প্রসেসে চালানো")
+    parser.add_argument("--trace-memory", action="store_true", help="tracemalloc দিয়ে মেমরি মাপা (ধীর)")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--json", dest="json_path", help="রিগ্রেশন ট্র্যাকিংয়ের জন্য ফলাফল JSON ফাইলে লেখা")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    result = asyncio.run(run(args))
+    print_report(result)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""মাল্টি-প্রসেস মোডের স্কেলিং টেস্ট
+
+প্রতিটি ওয়ার্কার সংখ্যার জন্য আসল `python main.py` (WORKERS=N, শেয়ার করা SQLite ক্যাটালগ) চালু করে
+নকল Bot API এর getUpdates দিয়ে ভিন্ন ভিন্ন ইউজারের `/start <টোকেন>` ক্লিক পাঠায়, আর সব ওয়ার্কারের
+/metrics থেকে start_command হ্যান্ডলারের কাউন্ট যোগ করে শেষ হওয়ার সময় মাপে।
+থ্রুপুট, ১ ওয়ার্কারের তুলনায় স্পিডআপ/দক্ষতা এবং প্রতি আপডেটে ফ্রন্ট/ওয়ার্কার/নকল API এর CPU খরচ দেখায়।
+CPU খরচ থেকে বোঝা যায় কোর বাড়ালে সিলিং কোথায় (ফ্রন্ট বা নকল API একক প্রসেস)।
+
+যথেষ্ট কোর থাকলে সবচেয়ে বড় N এর দক্ষতা --min-efficiency এর কম হলে exit code 1।
+
+উদাহরণ:
+    python bench/scaling_test.py --workers 1 2 4 --clicks 6000
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench.load_test import ADMIN_ID, CHANNEL, FakeServerProcess, UpdateFactory  # noqa: E402
+from storage import SqliteStorage  # noqa: E402
+from tokens import ACTION_VIEW, LinkTokenCodec  # noqa: E402
+
+LINK_SECRET = "scaling-bench-secret"
+START_COUNT = re.compile(r'^bot_handler_latency_seconds_count\{handler="start_command"\} (\d+)', re.MULTILINE)
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def free_port_range(count):
+    """পরপর count টি খালি পোর্ট (ওয়ার্কারের মেট্রিক পোর্ট METRICS_PORT + WORKER_INDEX, ফ্রন্টের METRICS_PORT + WORKERS)"""
+    for _ in range(100):
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            base = probe.getsockname()[1]
+        if base + count > 65535:
+            continue
+        try:
+            for port in range(base, base + count):
+                with socket.socket() as sock:
+                    sock.bind(("127.0.0.1", port))
+            return base
+        except OSError:
+            continue
+    raise RuntimeError("খালি পোর্ট পাওয়া যায়নি")
+
+
+def cpu_seconds(pid):
+    """একটি প্রসেসের user+system CPU সময় (/proc থেকে), না পাওয়া গেলে 0"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return 0.0
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+def child_pids(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+def seed_catalog(path, posts, videos_per_post):
+    storage = SqliteStorage(path).load()
+    permanent_ids = [
+        storage.add({"video_ids": [f"seed-video-{post}-{i}" for i in range(videos_per_post)],
+                     "photo_id": f"seed-photo-{post}"})
+        for post in range(posts)
+    ]
+    storage.close()
+    return permanent_ids
+
+
+def bot_environment(args, workdir, workers, api, metrics_port):
+    env = dict(os.environ)
+    env.update({
+        "BOT_TOKEN": "123456:BENCH",
+        "ADMIN_USER_ID": str(ADMIN_ID),
+        "CHANNEL_ID": str(CHANNEL),
+        "AD_URL": "https://example.com/ad",
+        "BOT_USERNAME": "bench_bot",
+        "LINK_SECRET": LINK_SECRET,
+        "BOT_API_BASE_URL": api.base_url,
+        "BOT_API_BASE_FILE_URL": api.base_url,
+        "BOT_MODE": "polling",
+        "POLL_TIMEOUT": "1",
+        # WORKERS=1 এও ফ্রন্ট প্রসেস, যাতে তুলনা একই আর্কিটেকচারে হয়
+        "BOT_ROLE": "front",
+        "WORKERS": str(workers),
+        "WORKER_SOCKET_DIR": workdir,
+        "METRICS_PORT": str(metrics_port),
+        "CATALOG_BACKEND": "sqlite",
+        "DATA_FILE": os.path.join(workdir, "video_data.json"),
+        "CATALOG_DB_FILE": os.path.join(workdir, "video_data.db"),
+        "DELETION_DB_FILE": os.path.join(workdir, "deletions.db"),
+        "SESSION_DB_FILE": os.path.join(workdir, "sessions.db"),
+        "CHANNEL_POSTS_DB_FILE": os.path.join(workdir, "channel_posts.db"),
+        "ANALYTICS_DB_FILE": os.path.join(workdir, "analytics.db"),
+        # ফ্লাড লিমিট নয়, হ্যান্ডলিং খরচ মাপা হচ্ছে
+        "SEND_RATE_PER_SECOND": str(1_000_000 * workers),
+        "SEND_PRIVATE_CHAT_INTERVAL": "0",
+        "UPDATE_CONCURRENCY": str(args.concurrency),
+        "LOG_DELIVERIES": "0",
+    })
+    return env
+
+
+async def handled_starts(client, metrics_port, workers):
+    """সব ওয়ার্কারের start_command কাউন্টের যোগফল; কোনো ওয়ার্কার এখনও তৈরি না হলে None"""
+    total = 0
+    for index in range(workers):
+        try:
+            response = await client.get(f"http://127.0.0.1:{metrics_port + index}/metrics")
+        except Exception:
+            return None
+        match = START_COUNT.search(response.text)
+        total += int(match.group(1)) if match else 0
+    return total
+
+
+async def wait_for_count(client, metrics_port, workers, target, timeout, front):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if front.poll() is not None:
+            raise RuntimeError(f"বট প্রসেস বন্ধ হয়ে গেছে (exit {front.returncode})")
+        count = await handled_starts(client, metrics_port, workers)
+        if count is not None and count >= target:
+            return count
+        await asyncio.sleep(0.02)
+    raise TimeoutError(f"{timeout}s এর মধ্যে {target} টি /start শেষ হয়নি")
+
+
+async def push_updates(client, api, updates, batch=1000):
+    for start in range(0, len(updates), batch):
+        await client.post(f"http://127.0.0.1:{api.port}/updates", content=json.dumps(updates[start:start + batch]))
+
+
+async def measure(args, workers):
+    import httpx
+
+    workdir = tempfile.mkdtemp(prefix=f"scaling-{workers}-")
+    permanent_ids = seed_catalog(os.path.join(workdir, "video_data.db"), args.posts, args.videos_per_post)
+    codec = LinkTokenCodec(LINK_SECRET)
+    factory = UpdateFactory()
+    user_ids = iter(range(10_000, 10_000_000))
+
+    def clicks(count):
+        # প্রতিটি ক্লিক নতুন ইউজারের, তাই রিপিট-ক্লিক পয়েন্টার নয়, পুরো লকড ডেলিভারি হয়
+        return [factory.command(next(user_ids), f"/start {codec.encode(ACTION_VIEW, permanent_ids[i % len(permanent_ids)])}")
+                for i in range(count)]
+
+    api = FakeServerProcess(args)
+    await api.start()
+    metrics_port = free_port_range(workers + 1)
+    log_path = os.path.join(workdir, "bot.log")
+    with open(log_path, "w") as log:
+        front = subprocess.Popen([sys.executable, os.path.join(ROOT, "main.py")], cwd=workdir,
+                                 env=bot_environment(args, workdir, workers, api, metrics_port),
+                                 stdout=log, stderr=subprocess.STDOUT)
+    try:
+        async with httpx.AsyncClient(timeout=30) as client:
+            # ওয়ার্কার চালু ও HTTP কানেকশন গরম করা
+            await wait_for_count(client, metrics_port, workers, 0, args.timeout, front)
+            warmup = clicks(args.warmup * workers)
+            await push_updates(client, api, warmup)
+            baseline = await wait_for_count(client, metrics_port, workers, len(warmup), args.timeout, front)
+
+            worker_pids = child_pids(front.pid)
+            pids = {"front": [front.pid], "workers": worker_pids, "api": [api.process.pid]}
+            cpu_before = {role: sum(cpu_seconds(pid) for pid in role_pids) for role, role_pids in pids.items()}
+
+            workload = clicks(args.clicks)
+            started = time.perf_counter()
+            await push_updates(client, api, workload)
+            await wait_for_count(client, metrics_port, workers, baseline + len(workload), args.timeout, front)
+            elapsed = time.perf_counter() - started
+
+            cpu_after = {role: sum(cpu_seconds(pid) for pid in role_pids) for role, role_pids in pids.items()}
+    finally:
+        front.send_signal(signal.SIGINT)
+        try:
+            front.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            front.kill()
+            front.wait()
+        await api.stop()
+
+    return {
+        "workers": workers,
+        "worker_processes": len(worker_pids),
+        "updates": len(workload),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round(len(workload) / elapsed, 1),
+        "cpu_ms_per_update": {
+            role: round((cpu_after[role] - cpu_before[role]) * 1000 / len(workload), 3) for role in cpu_before
+        },
+        "log": log_path,
+    }
+
+
+def print_report(results, cores):
+    base = results[0]["throughput_per_second"] / results[0]["workers"]
+    print(f"CPU কোর: {cores}")
+    print(f"{'ওয়ার্কার':>8} {'আপডেট/s':>10} {'স্পিডআপ':>8} {'দক্ষতা':>7}   CPU ms/আপডেট (ফ্রন্ট / ওয়ার্কার / নকল API)")
+    for result in results:
+        speedup = result["throughput_per_second"] / base
+        result["speedup"] = round(speedup, 2)
+        result["efficiency"] = round(speedup / result["workers"], 2)
+        cpu = result["cpu_ms_per_update"]
+        print(f"{result['workers']:>8} {result['throughput_per_second']:>10} {speedup:>8.2f} {result['efficiency']:>7.2f}   "
+              f"{cpu['front']} / {cpu['workers']} / {cpu['api']}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="মাল্টি-প্রসেস মোডে /start হ্যান্ডলিংয়ের স্কেলিং টেস্ট")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="যে ওয়ার্কার সংখ্যাগুলো মাপা হবে")
+    parser.add_argument("--clicks", type=int, default=4000, help="প্রতিটি রানে মাপা /start ক্লিক")
+    parser.add_argument("--warmup", type=int, default=50, help="মাপার আগে প্রতি ওয়ার্কারে ক্লিক")
+    parser.add_argument("--posts", type=int, default=50)
+    parser.add_argument("--videos-per-post", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--api-latency-ms", type=float, default=0.0)
+    parser.add_argument("--api-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--min-efficiency", type=float, default=0.7,
+                        help="সবচেয়ে বড় N এ ন্যূনতম দক্ষতা (স্পিডআপ / N)")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--json", dest="json_path", help="ফলাফল JSON ফাইলে লেখা")
+    args = parser.parse_args(argv)
+    # FakeServerProcess এর জন্য
+    args.flood_rate = 0.0
+    args.retry_after = 1
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workers_list = sorted(set(args.workers))
+    results = [asyncio.run(measure(args, workers)) for workers in workers_list]
+    cores = os.cpu_count() or 1
+    print_report(results, cores)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    largest = results[-1]
+    # ফ্রন্ট ও নকল API নিজেরাও কোর নেয়, তাই ওয়ার্কার + ২
+    if cores < largest["workers"] + 2:
+        print(f"⚠️ {largest['workers']} ওয়ার্কারের স্কেলিং যাচাইয়ের জন্য যথেষ্ট কোর নেই; দক্ষতা যাচাই বাদ দেওয়া হলো।")
+        return 0
+    if largest["efficiency"] < args.min_efficiency:
+        print(f"❌ {largest['workers']} ওয়ার্কারে দক্ষতা {largest['efficiency']} < {args.min_efficiency}")
+        return 1
+    print(f"✅ {largest['workers']} ওয়ার্কারে দক্ষতা {largest['efficiency']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# --- ভিডিও ক্যাটালগ ---
+class VideoCatalog:
+    """স্টোরেজ ব্যাকএন্ডের উপর একটি পাতলা স্তর; লুকআপ সরাসরি, ডিস্কে লেখা ব্যাচ করে ব্যাকগ্রাউন্ডে"""
+
+    def __init__(self, storage, flush_interval=2.0):
+        self.storage = storage
+        self.flush_interval = flush_interval
+        self.version = 0  # প্রতিটি পরিবর্তনে বাড়ে
+        self._wakeup = None
+        self._flush_task = None
+
+    def __len__(self):
+        return self.storage.count()
+
+    def get(self, permanent_id):
+        """পার্মানেন্ট ID (str বা int) দিয়ে রেকর্ড খোঁজে"""
+        return self.storage.get(permanent_id)
+
+    def add(self, record):
+        """নতুন রেকর্ড যোগ করে পার্মানেন্ট ID ফেরত দেয়"""
+        permanent_id = self.storage.add(record)
+        self.version += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        logger.debug(f"ক্যাটালগে যোগ হলো: ID {permanent_id}")
+        return permanent_id
+
+    def ensure_legacy_cutoff(self):
+        """এর সমান বা বড় ID এর জন্য সাইনবিহীন (legacy) লিংক কখনও প্রকাশিত হয়নি"""
+        cutoff = self.storage.ensure_legacy_cutoff()
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return cutoff
+
+    def iter_records(self, after_id=0, batch_size=500):
+        return self.storage.iter_records(after_id=after_id, batch_size=batch_size)
+
+    def flush(self):
+        """সিঙ্ক্রোনাসভাবে ডিস্কে লেখে (শাটডাউন বা ইভেন্ট লুপের বাইরে ব্যবহারের জন্য)"""
+        write = self.storage.prepare_flush()
+        if write is not None:
+            write()
+
+    async def flush_async(self, raise_errors=False):
+        """ইভেন্ট লুপ ব্লক না করে থ্রেডে ফাইল লেখে; raise_errors হলে ব্যর্থতা কলারকে জানায়"""
+        write = self.storage.prepare_flush()
+        if write is None:
+            return
+        try:
+            await asyncio.to_thread(write)
+        except OSError as e:
+            if raise_errors:
+                raise
+            logger.error(f"ক্যাটালগ সেভ করতে ব্যর্থ: {e}")
+
+    async def _flush_loop(self):
+        while True:
+            await self._wakeup.wait()
+            # ছোট উইন্ডোতে আসা সব পরিবর্তন একসাথে লেখা হবে
+            await asyncio.sleep(self.flush_interval)
+            self._wakeup.clear()
+            await self.flush_async()
+
+    async def start(self):
+        """ব্যাকগ্রাউন্ড ফ্লাশার চালু করে"""
+        self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """ফ্লাশার থামিয়ে বাকি পরিবর্তন লিখে দেয়"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush_async()
+        self.storage.close()
@@ -0,0 +1,60 @@
+import time
+from collections import OrderedDict
+
+
+# --- ইউজার প্রতি ডেলিভারি ইনডেক্স (রিপিট ক্লিকে পুরো রিসেন্ড এড়াতে) ---
+class DeliveryIndex:
+    """(user_id, permanent_id, kind) -> ইতিমধ্যে পাঠানো ও এখনও জীবিত মেসেজ ID
+
+    এন্ট্রি মেসেজগুলোর ডিলিট হওয়ার আগেই (ttl - margin) মেয়াদোত্তীর্ণ হয়, আর maxsize
+    ছাড়ালে সবচেয়ে পুরোনো এন্ট্রি বাদ যায়।
+    """
+
+    def __init__(self, maxsize=50000, ttl=4 * 3600, margin=60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.margin = margin
+        self.hits = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (expires_at, chat_id, message_ids)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def record(self, user_id, permanent_id, kind, chat_id, message_ids):
+        if not message_ids or self.ttl <= self.margin:
+            return
+        now = time.monotonic()
+        # সব এন্ট্রির ttl সমান, তাই সামনের দিকেরগুলোই আগে মেয়াদোত্তীর্ণ হয়
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest[0] > now:
+                break
+            self._entries.popitem(last=False)
+        key = (user_id, permanent_id, kind)
+        self._entries.pop(key, None)
+        self._entries[key] = (now + self.ttl - self.margin, chat_id, list(message_ids))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def lookup(self, user_id, permanent_id, kind):
+        """(chat_id, message_ids, বাকি সময়) অথবা None"""
+        key = (user_id, permanent_id, kind)
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, chat_id, message_ids = item
+        remaining = expires_at - time.monotonic()
+        if remaining <= 0:
+            del self._entries[key]
+            return None
+        self.hits += 1
+        # ইউজার যতক্ষণে পয়েন্টার দেখবে ততক্ষণ মূল মেসেজ থাকবে: margin যোগ করে আসল ডিলিট সময়
+        return chat_id, message_ids, remaining + self.margin
+
+    def forget(self, user_id, permanent_id, kind):
+        self._entries.pop((user_id, permanent_id, kind), None)
+
+    def stats(self):
+        return {"size": len(self._entries), "hits": self.hits, "evictions": self.evictions}
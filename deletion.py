@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+
+from telegram.error import BadRequest, Forbidden, RetryAfter, TelegramError
+
+from sender import PRIORITY_DELETE, retry_after_seconds
+from storage import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+DELETE_MESSAGES_LIMIT = 100  # deleteMessages এ একবারে সর্বোচ্চ মেসেজ সংখ্যা
+MAX_DELETE_ATTEMPTS = 5
+RETRY_DELAY_SECONDS = 60
+
+DELETION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_deletions (
+    chat_id INTEGER NOT NULL,
+    message_id INTEGER NOT NULL,
+    due_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (chat_id, message_id)
+);
+CREATE INDEX IF NOT EXISTS idx_pending_deletions_due ON pending_deletions (due_at);
+"""
+
+
+# --- স্থায়ী ডিলিট কিউ ---
+class DeletionQueue:
+    """ডিলিট করার মেসেজগুলো ডিস্কে due time অনুযায়ী রাখে; একটি সুইপার চ্যাট-ভিত্তিক ব্যাচে ডিলিট করে"""
+
+    def __init__(self, path, sweep_interval=30.0, batch_limit=1000, sender=None):
+        self.path = path
+        self.sender = sender  # থাকলে ডিলিট কলগুলো সবচেয়ে কম প্রায়োরিটির লেনে যায়
+        self.sweep_interval = sweep_interval
+        self.batch_limit = batch_limit
+        self.conn = None
+        self._sweeper_task = None
+
+    def open(self):
+        self.conn = connect_sqlite(self.path)
+        self.conn.executescript(DELETION_SCHEMA)
+        backlog = self.depth()
+        if backlog:
+            logger.info(f"আগের ডিলিট কিউ পাওয়া গেছে: {backlog} টি মেসেজ অপেক্ষমাণ")
+        return self
+
+    def schedule(self, chat_id, message_ids, delay):
+        """delay সেকেন্ড পর মেসেজগুলো ডিলিট করার জন্য কিউতে রাখে"""
+        due_at = time.time() + delay
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO pending_deletions (chat_id, message_id, due_at) VALUES (?, ?, ?)",
+            [(chat_id, message_id, due_at) for message_id in message_ids],
+        )
+
+    def depth(self):
+        """কিউতে অপেক্ষমাণ মেসেজের সংখ্যা"""
+        return self.conn.execute("SELECT COUNT(*) FROM pending_deletions").fetchone()[0]
+
+    def _due_batch(self, now):
+        return self.conn.execute(
+            "SELECT chat_id, message_id, attempts FROM pending_deletions WHERE due_at <= ? ORDER BY due_at LIMIT ?",
+            (now, self.batch_limit),
+        ).fetchall()
+
+    def _settle(self, done, failed, delay):
+        """সফল/বাতিল মেসেজ মুছে ফেলে এবং ব্যর্থগুলো পিছিয়ে দেয়, একটি ট্রানজ্যাকশনে"""
+        if not done and not failed:
+            return
+        due_at = time.time() + delay
+        conn = self.conn
+        conn.execute("BEGIN")
+        try:
+            conn.executemany("DELETE FROM pending_deletions WHERE chat_id = ? AND message_id = ?", done)
+            conn.executemany(
+                "UPDATE pending_deletions SET due_at = ?, attempts = attempts + 1 WHERE chat_id = ? AND message_id = ?",
+                [(due_at, chat_id, message_id) for chat_id, message_id in failed],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    async def _delete_chunk(self, bot, chat_id, chunk, attempts):
+        """একটি deleteMessages কল; (done, failed, retry_after) ফেরত দেয়"""
+        keys = [(chat_id, message_id) for message_id in chunk]
+        try:
+            if self.sender is not None:
+                await self.sender.run(PRIORITY_DELETE, chat_id, bot.delete_messages, chat_id=chat_id, message_ids=chunk)
+            else:
+                await bot.delete_messages(chat_id=chat_id, message_ids=chunk)
+            return keys, [], 0
+        except RetryAfter as e:
+            # সেন্ডারের নিজের রিট্রাই শেষ; মেসেজগুলো due অবস্থায় থাকে, পরের সুইপে হবে
+            return [], [], retry_after_seconds(e)
+        except (BadRequest, Forbidden) as e:
+            # মেসেজ অনেক পুরনো বা ইউজার বট ব্লক করেছে — আর চেষ্টা করে লাভ নেই
+            logger.warning(f"মেসেজ ডিলিট করা সম্ভব নয়: Chat ID {chat_id}, {len(chunk)} টি মেসেজ. ত্রুটি: {e}")
+            return keys, [], 0
+        except TelegramError as e:
+            logger.warning(f"মেসেজ ডিলিট করতে ব্যর্থ: Chat ID {chat_id}, {len(chunk)} টি মেসেজ. ত্রুটি: {e}")
+            done = [key for key in keys if attempts[key] + 1 >= MAX_DELETE_ATTEMPTS]
+            failed = [key for key in keys if attempts[key] + 1 < MAX_DELETE_ATTEMPTS]
+            return done, failed, 0
+
+    async def sweep(self, bot):
+        """due হওয়া মেসেজগুলো চ্যাট অনুযায়ী ভাগ করে deleteMessages দিয়ে মুছে ফেলে; কতগুলো প্রসেস হলো তা ফেরত দেয়
+
+        সব চ্যাটের কল একসাথে জমা হয়; গতি ও চ্যাট-ভিত্তিক ব্যবধান সেন্ড শিডিউলার ঠিক করে।
+        """
+        rows = self._due_batch(time.time())
+        if not rows:
+            return 0
+
+        per_chat = defaultdict(list)
+        attempts = {}
+        for chat_id, message_id, tries in rows:
+            per_chat[chat_id].append(message_id)
+            attempts[(chat_id, message_id)] = tries
+
+        calls = [
+            self._delete_chunk(bot, chat_id, message_ids[start:start + DELETE_MESSAGES_LIMIT], attempts)
+            for chat_id, message_ids in per_chat.items()
+            for start in range(0, len(message_ids), DELETE_MESSAGES_LIMIT)
+        ]
+        done, failed, retry_after = [], [], 0
+        for chunk_done, chunk_failed, chunk_retry_after in await asyncio.gather(*calls):
+            done.extend(chunk_done)
+            failed.extend(chunk_failed)
+            retry_after = max(retry_after, chunk_retry_after)
+
+        self._settle(done, failed, RETRY_DELAY_SECONDS)
+        logger.info(f"ডিলিট সুইপ: {len(done)} টি মেসেজ সম্পন্ন, {len(failed)} টি পরে আবার চেষ্টা হবে")
+        if retry_after:
+            logger.warning(f"ডিলিট কিউ ফ্লাড লিমিটে পড়েছে, {retry_after} সেকেন্ড অপেক্ষা")
+            await asyncio.sleep(retry_after)
+            return len(done) + len(failed)
+        return len(rows)
+
+    async def _sweep_loop(self, bot):
+        while True:
+            try:
+                processed = await self.sweep(bot)
+            except Exception as e:
+                logger.error(f"ডিলিট সুইপ ব্যর্থ: {e}")
+                processed = 0
+            # ব্যাচ পূর্ণ হলে (ব্যাকলগ আছে) সাথে সাথে আবার চালানো হবে
+            if processed < self.batch_limit:
+                await asyncio.sleep(self.sweep_interval)
+
+    async def start(self, bot):
+        """পিরিয়ডিক সুইপার চালু করে; রিস্টার্টের পর আগের ব্যাকলগ থেকেই শুরু হয়"""
+        self._sweeper_task = asyncio.create_task(self._sweep_loop(bot))
+
+    async def stop(self):
+        """সুইপার থামায়; ডাটাবেস খোলা থাকে (বন্ধের শেষে close)"""
+        if self._sweeper_task is not None:
+            self._sweeper_task.cancel()
+            try:
+                await self._sweeper_task
+            except asyncio.CancelledError:
+                pass
+            self._sweeper_task = None
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
@@ -0,0 +1,68 @@
+import logging
+
+from telegram import InputMediaVideo
+from telegram.error import TelegramError
+
+from sender import PRIORITY_USER
+
+logger = logging.getLogger(__name__)
+
+MEDIA_GROUP_LIMIT = 10  # Telegram অ্যালবামে সর্বোচ্চ আইটেম
+
+
+# --- অ্যালবাম ভাগ করা ---
+def build_media_chunks(video_ids):
+    """ভিডিওগুলো ≤10 আইটেমের অংশে ভাগ করে; প্রতিটি অংশের প্রথম ভিডিওতে "ভিডিও i / N" ক্যাপশন"""
+    total = len(video_ids)
+    if total == 0:
+        return []
+    # অংশগুলো যতটা সম্ভব সমান (যেমন ১১ = ৬ + ৫), যাতে কোনো অংশে একটি মাত্র ভিডিও না থাকে
+    chunk_count = -(-total // MEDIA_GROUP_LIMIT)
+    base, extra = divmod(total, chunk_count)
+    chunks, start = [], 0
+    for index in range(chunk_count):
+        size = base + (1 if index < extra else 0)
+        media = [
+            InputMediaVideo(media=file_id, caption=f"🎬 ভিডিও {start + 1} / {total}" if offset == 0 else "")
+            for offset, file_id in enumerate(video_ids[start:start + size])
+        ]
+        chunks.append(media)
+        start += size
+    return chunks
+
+
+class DeliveryResult:
+    __slots__ = ("message_ids", "failed_chunks")
+
+    def __init__(self, message_ids, failed_chunks):
+        self.message_ids = message_ids
+        self.failed_chunks = failed_chunks
+
+    @property
+    def ok(self):
+        return not self.failed_chunks
+
+
+async def _send_chunk(sender, bot, chat_id, media, priority):
+    # sendMediaGroup কমপক্ষে ২টি আইটেম নেয়, তাই একক ভিডিও sendVideo দিয়ে যায়
+    if len(media) == 1:
+        item = media[0]
+        message = await sender.run(priority, chat_id, bot.send_video, chat_id=chat_id, video=item.media, caption=item.caption)
+        return [message]
+    return await sender.run(priority, chat_id, bot.send_media_group, chat_id=chat_id, media=media)
+
+
+# --- অংশগুলো ক্রমানুসারে পাঠানো ---
+async def deliver_media_chunks(sender, bot, chat_id, chunks, priority=PRIORITY_USER):
+    """অংশগুলো একটির পর একটি পাঠায়; প্রতিটি অংশ পৌঁছানোর পরই পরেরটি যায়, তাই চ্যাটে ক্রম ঠিক থাকে।
+    RetryAfter/NetworkError এর রিট্রাই সেন্ড শিডিউলার সেই অংশের জায়গাতেই করে; তারপরও ব্যর্থ হলে
+    বাকি অংশ পাঠানো হয় না। পৌঁছানো সব মেসেজের ID (ডিলিট শিডিউলের জন্য) ফেরত দেয়।"""
+    message_ids = []
+    for index, media in enumerate(chunks):
+        try:
+            messages = await _send_chunk(sender, bot, chat_id, media, priority)
+        except TelegramError as e:
+            logger.error(f"অ্যালবামের অংশ {index + 1}/{len(chunks)} পাঠাতে ব্যর্থ (Chat ID {chat_id}): {e}")
+            return DeliveryResult(message_ids, list(range(index, len(chunks))))
+        message_ids.extend(message.message_id for message in messages)
+    return DeliveryResult(message_ids, [])
@@ -0,0 +1,96 @@
+import time
+from collections import OrderedDict
+
+from metrics import LINK_CACHE_HITS, LINK_CACHE_MISSES
+
+
+# --- প্রি-বিল্ট রিপ্লাই ---
+class LinkReply:
+    """একটি deep-link payload এর রিজলভ করা রেকর্ড ও আগে থেকে তৈরি রিপ্লাই অবজেক্ট
+
+    ইউজার-নির্দিষ্ট আনলক টোকেনের জন্য user_id ও টোকেনের মেয়াদ (expires_at) রাখা হয়, যাতে ক্যাশ hit এও যাচাই হয়।
+    """
+
+    __slots__ = ("permanent_id", "is_unlocked", "record", "locked_caption", "ad_keyboard", "media_chunks",
+                 "user_id", "expires_at")
+
+    def __init__(self, permanent_id, is_unlocked, record, locked_caption=None, ad_keyboard=None,
+                 media_chunks=None, user_id=None, expires_at=None):
+        self.permanent_id = permanent_id
+        self.is_unlocked = is_unlocked
+        self.record = record
+        self.locked_caption = locked_caption
+        self.ad_keyboard = ad_keyboard
+        self.media_chunks = media_chunks  # ≤10 ভিডিওর InputMediaVideo অংশের তালিকা
+        self.user_id = user_id  # None হলে যেকোনো ইউজার
+        self.expires_at = expires_at  # None হলে মেয়াদহীন (wall-clock সেকেন্ড)
+
+
+# --- LRU + TTL ক্যাশ ---
+class LinkCache:
+    """raw payload স্ট্রিং -> LinkReply; ক্যাটালগ বদলালে (version বাড়লে) পুরো ক্যাশ বাতিল হয়"""
+
+    def __init__(self, catalog, maxsize=10000, ttl=600.0):
+        self.catalog = catalog
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # payload -> (expires_at, LinkReply)
+        self._catalog_version = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _check_catalog(self):
+        version = self.catalog.version if self.catalog is not None else None
+        if version != self._catalog_version:
+            self._entries.clear()
+            self._catalog_version = version
+
+    def get(self, payload, user_id=None):
+        """ক্যাশ করা রিপ্লাই; অন্য ইউজারের বা মেয়াদ পার হওয়া আনলক টোকেনের জন্য None (miss)"""
+        self._check_catalog()
+        item = self._entries.get(payload)
+        if item is None:
+            self._miss()
+            return None
+        expires_at, reply = item
+        if expires_at < time.monotonic() or (reply.expires_at is not None and reply.expires_at < time.time()):
+            del self._entries[payload]
+            self._miss()
+            return None
+        if reply.user_id is not None and reply.user_id != user_id:
+            self._miss()
+            return None
+        self._entries.move_to_end(payload)
+        self.hits += 1
+        LINK_CACHE_HITS.inc()
+        return reply
+
+    def _miss(self):
+        self.misses += 1
+        LINK_CACHE_MISSES.inc()
+
+    def put(self, payload, reply):
+        self._check_catalog()
+        self._entries[payload] = (time.monotonic() + self.ttl, reply)
+        self._entries.move_to_end(payload)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self):
+        self._entries.clear()
+
+    def stats(self):
+        """hit/miss কাউন্টার ও বর্তমান আকার"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
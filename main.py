@@ -1,12 +1,37 @@
 import telegram
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, MessageHandler, CommandHandler, filters, ContextTypes, JobQueue
+from telegram.error import TelegramError
+from telegram.ext import Application, MessageHandler, CommandHandler, TypeHandler, filters, ContextTypes
 import logging
-import json
 import os
+import asyncio
 import base64
+import functools
+import hashlib
+import re
+import signal
+import sys
+import tempfile
 import time
 
+from analytics import Analytics
+from backfill import BACKFILL_MODES, BackfillJob, ChannelPostStore
+from catalog import VideoCatalog
+from dedup import DeliveryIndex
+from deletion import DeletionQueue
+from delivery import build_media_chunks, deliver_media_chunks
+from link_cache import LinkCache, LinkReply
+from metrics import (
+    CATALOG_MISSES, DELIVERIES, DELIVERY_FAILURES, DELIVERY_REPLAYS, INVALID_LINKS, PENDING_DELETIONS,
+    SEND_QUEUE_DEPTH, UPDATES_IN_FLIGHT, WORKER_QUEUE_DEPTH, MetricsServer, timed,
+)
+from processor import InFlightUpdateQueue, PerUserUpdateProcessor
+from sender import PRIORITY_CHANNEL, PRIORITY_DELETE, PRIORITY_USER, SendScheduler
+from sessions import AlbumCollector, UploadSessionStore
+from storage import CatalogLoadError, open_storage
+from tokens import ACTION_UNLOCK, ACTION_VIEW, InvalidToken, LinkTokenCodec
+from workers import WorkerPool, send_ack, start_update_server, worker_for
+
 # --- কনফিগারেশন: Railway Environment Variables থেকে লোড হবে ---
 BOT_TOKEN = os.environ.get("BOT_TOKEN")  
 try:
@@ -18,10 +43,77 @@ except (TypeError, ValueError):
     CHANNEL_ID = 0
 
 BOT_USERNAME = os.environ.get("BOT_USERNAME")  
+AD_URL = os.environ.get("AD_URL")
+# --- deep-link টোকেন ---
+LINK_SECRET = os.environ.get("LINK_SECRET")  # আবশ্যক; বদলালে চ্যানেলে আগে পোস্ট করা সব লিংক বাতিল হবে
+LEGACY_LINKS = os.environ.get("LEGACY_LINKS", "1") != "0"  # আগে প্রকাশিত base64("VID_<id>") লিংক গ্রহণ করা
+# এর সমান বা বড় ID এর legacy লিংক বাতিল; না দিলে প্রথম চালুর সময়ের next_id ক্যাটালগে স্থায়ীভাবে রাখা হয়
+LEGACY_LINK_CUTOFF = int(os.environ["LEGACY_LINK_CUTOFF"]) if os.environ.get("LEGACY_LINK_CUTOFF") else None
+UNLOCK_LINK_TTL = float(os.environ.get("UNLOCK_LINK_TTL", str(24 * 3600)))  # আনলক বাটনের লিংক কতক্ষণ চলবে
 DATA_FILE = os.environ.get("DATA_FILE", "video_data.json")
+CATALOG_BACKEND = os.environ.get("CATALOG_BACKEND", "json").lower()  # json অথবা sqlite
+CATALOG_DB_FILE = os.environ.get("CATALOG_DB_FILE", "video_data.db")
+CATALOG_FLUSH_SECONDS = float(os.environ.get("CATALOG_FLUSH_SECONDS", "2.0"))  # ক্যাটালগ ব্যাচ-ফ্লাশের বিরতি
+# --- আপডেট গ্রহণের মোড: polling (ডিফল্ট) অথবা webhook ---
+BOT_MODE = os.environ.get("BOT_MODE", "polling").lower()
+WEBHOOK_URL = os.environ.get("WEBHOOK_URL")  # পাবলিক HTTPS বেস URL, যেমন https://example.up.railway.app
+WEBHOOK_PATH = os.environ.get("WEBHOOK_PATH", "telegram")
+WEBHOOK_LISTEN = os.environ.get("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.environ.get("WEBHOOK_PORT", os.environ.get("PORT", "8443")))
+WEBHOOK_SECRET_TOKEN = os.environ.get("WEBHOOK_SECRET_TOKEN")
+WEBHOOK_MAX_CONNECTIONS = int(os.environ.get("WEBHOOK_MAX_CONNECTIONS", "40"))
+UPDATE_QUEUE_SIZE = int(os.environ.get("UPDATE_QUEUE_SIZE", "1000"))  # কিউতে ও প্রসেসিংয়ে মোট সর্বোচ্চ আপডেট
+POLL_INTERVAL = float(os.environ.get("POLL_INTERVAL", "0"))
+POLL_TIMEOUT = int(os.environ.get("POLL_TIMEOUT", "30"))  # long-poll অপেক্ষার সময় (সেকেন্ড)
+ALLOWED_UPDATES = ["message"]  # বট শুধু মেসেজ আপডেট ব্যবহার করে
+UPDATE_CONCURRENCY = int(os.environ.get("UPDATE_CONCURRENCY", "64"))  # একসাথে কতগুলো আপডেট প্রসেস হবে
+UPDATE_MAX_PENDING_PER_USER = int(os.environ.get("UPDATE_MAX_PENDING_PER_USER", "16"))  # এর বেশি জমলে বাদ (এডমিন বাদে)
+BOT_API_BASE_URL = os.environ.get("BOT_API_BASE_URL")  # লোকাল Bot API সার্ভার/বেঞ্চমার্কের জন্য, যেমন http://host/bot
+BOT_API_BASE_FILE_URL = os.environ.get("BOT_API_BASE_FILE_URL")
+
+# --- মাল্টি-প্রসেস মোড: ফ্রন্ট প্রসেস আপডেট নিয়ে ইউজার ID অনুযায়ী ওয়ার্কারে পাঠায় ---
+WORKERS = int(os.environ.get("WORKERS", "1"))  # ১ এর বেশি হলে মাল্টি-প্রসেস মোড (CATALOG_BACKEND=sqlite লাগবে)
+BOT_ROLE = os.environ.get("BOT_ROLE", "").lower()  # "front" দিলে WORKERS=1 এও ফ্রন্ট + ওয়ার্কার; "worker" শুধু ফ্রন্ট সেট করে
+WORKER_INDEX = int(os.environ.get("WORKER_INDEX", "0"))
+WORKER_SOCKET = os.environ.get("WORKER_SOCKET")
+WORKER_SOCKET_DIR = os.environ.get("WORKER_SOCKET_DIR")  # না দিলে প্রতি চালুতে নতুন টেম্প ফোল্ডার
+WORKER_QUEUE_SIZE = int(os.environ.get("WORKER_QUEUE_SIZE", "1000"))  # ফ্রন্টে প্রতিটি ওয়ার্কারের জন্য অপেক্ষমাণ আপডেট; ভরা থাকলে বাদ
+IS_WORKER = BOT_ROLE == "worker"
+
+# --- আউটবাউন্ড সেন্ড শিডিউলার (Telegram ফ্লাড লিমিট মেনে) ---
+SEND_RATE_PER_SECOND = float(os.environ.get("SEND_RATE_PER_SECOND", "30"))
+SEND_PRIVATE_CHAT_INTERVAL = float(os.environ.get("SEND_PRIVATE_CHAT_INTERVAL", "0.3"))
+SEND_GROUP_CHAT_INTERVAL = float(os.environ.get("SEND_GROUP_CHAT_INTERVAL", "3.0"))
+SEND_WORKERS = int(os.environ.get("SEND_WORKERS", "16"))
+
+LINK_CACHE_SIZE = int(os.environ.get("LINK_CACHE_SIZE", "10000"))  # হট-লিংক ক্যাশে সর্বোচ্চ এন্ট্রি
+LINK_CACHE_TTL = float(os.environ.get("LINK_CACHE_TTL", "600"))
+
+# --- মেট্রিক ও লগিং ---
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))  # 0 হলে /metrics এন্ডপয়েন্ট বন্ধ
+# প্রতি ডেলিভারির লগ: LOG_DELIVERIES=0 দিলে DEBUG লেভেলে নেমে যায় (হট পাথে ফরম্যাটিং খরচ বাঁচে)
+DELIVERY_LOG_LEVEL = logging.INFO if os.environ.get("LOG_DELIVERIES", "1") != "0" else logging.DEBUG
+
 DELETION_TIME_SECONDS = 4 * 3600  # ৪ ঘন্টা পর ইউজারের ভিডিও অটো ডিলিট
+DELETION_DB_FILE = os.environ.get("DELETION_DB_FILE", "deletions.db")
+DELETION_SWEEP_SECONDS = float(os.environ.get("DELETION_SWEEP_SECONDS", "30"))  # ডিলিট সুইপারের বিরতি
+DELIVERY_INDEX_SIZE = int(os.environ.get("DELIVERY_INDEX_SIZE", "50000"))  # রিপিট-ক্লিক ইনডেক্সে সর্বোচ্চ এন্ট্রি
+
+# --- এডমিন আপলোড সেশন ---
+SESSION_DB_FILE = os.environ.get("SESSION_DB_FILE", "sessions.db")
+SESSION_TTL_SECONDS = float(os.environ.get("SESSION_TTL_SECONDS", str(24 * 3600)))  # অসম্পূর্ণ আপলোড সেশনের মেয়াদ
+ALBUM_DEBOUNCE_SECONDS = float(os.environ.get("ALBUM_DEBOUNCE_SECONDS", "1.5"))  # অ্যালবামের শেষ অংশের পর অপেক্ষা
+
+# --- অ্যানালিটিক্স (ভিডিও প্রতি ঘন্টাভিত্তিক কাউন্টার) ---
+ANALYTICS_DB_FILE = os.environ.get("ANALYTICS_DB_FILE", "analytics.db")
+ANALYTICS_FLUSH_SECONDS = float(os.environ.get("ANALYTICS_FLUSH_SECONDS", "60"))  # মেমরি থেকে ডিস্কে লেখার বিরতি
+ANALYTICS_MAX_KEYS = int(os.environ.get("ANALYTICS_MAX_KEYS", "50000"))  # ফ্লাশের আগে মেমরিতে সর্বোচ্চ (ঘন্টা, ভিডিও)
 
-STAGED_UPLOADS = {}
+# --- চ্যানেল পোস্ট ইনডেক্স ও বাল্ক ব্যাকফিল ---
+CHANNEL_POSTS_DB_FILE = os.environ.get("CHANNEL_POSTS_DB_FILE", "channel_posts.db")
+BACKFILL_BATCH_SIZE = int(os.environ.get("BACKFILL_BATCH_SIZE", "20"))  # প্রতি চেকপয়েন্টে কতগুলো পোস্ট
+BACKFILL_REPORT_SECONDS = float(os.environ.get("BACKFILL_REPORT_SECONDS", "30"))  # এডমিনকে অগ্রগতি জানানোর বিরতি
 
 # --- লগিং ---
 logging.basicConfig(
@@ -30,247 +122,387 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# --- ডাটা লোড/সেভ ---
-def load_data():
-    if os.path.exists(DATA_FILE):
-        try:
-            with open(DATA_FILE, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            logger.error("JSON ফাইল লোড করতে সমস্যা হয়েছে, নতুন ডাটা স্ট্রাকচার তৈরি হচ্ছে।")
-            return {"videos": {}, "next_id": 1}
-    return {"videos": {}, "next_id": 1}
-
-def save_data(data):
-    try:
-        with open(DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
-    except IOError as e:
-        logger.error(f"ডাটা সেভ করতে ব্যর্থ: {e}")
-
-# --- শিডিউলড ডিলিট ফাংশন ---
-async def delete_scheduled_message(context: ContextTypes.DEFAULT_TYPE):
-    job_data = context.job.data
-    chat_id = job_data['chat_id']
-    message_id = job_data['message_id']
-    try:
-        await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
-        logger.info(f"মেসেজ ডিলিট সফল: Chat ID {chat_id}, Message ID {message_id}")
-    except Exception as e:
-        logger.warning(f"মেসেজ ডিলিট করতে ব্যর্থ: Chat ID {chat_id}, Message ID {message_id}. ত্রুটি: {e}")
+# --- ভিডিও ক্যাটালগ: main() এ স্টোরেজ ব্যাকএন্ড খুলে তৈরি হয় ---
+CATALOG = None
+LINK_CACHE = None  # payload -> প্রি-বিল্ট রিপ্লাই, ক্যাটালগ তৈরি হওয়ার পর
+LEGACY_CUTOFF = None  # সাইন করা লিংক চালুর সময়ের next_id (init_services এ সেট হয়)
+# মাল্টি-প্রসেস মোডে প্রতিটি ওয়ার্কার নিজের পোর্টে: METRICS_PORT + WORKER_INDEX
+METRICS_SERVER = MetricsServer(METRICS_HOST, METRICS_PORT + WORKER_INDEX) if METRICS_PORT else None
+REMOVE_KEYBOARD = telegram.ReplyKeyboardRemove()
+
+# --- সব আউটবাউন্ড কল এই কিউ দিয়ে যায়: ইউজার ডেলিভারি > চ্যানেল পোস্ট > ডিলিট ---
+# বটের মোট ফ্লাড লিমিট সব ওয়ার্কারের মধ্যে ভাগ হয়
+SENDER = SendScheduler(
+    rate=SEND_RATE_PER_SECOND / WORKERS if IS_WORKER else SEND_RATE_PER_SECOND,
+    private_chat_interval=SEND_PRIVATE_CHAT_INTERVAL,
+    group_chat_interval=SEND_GROUP_CHAT_INTERVAL,
+    workers=SEND_WORKERS,
+)
+
+# --- সাইন করা deep-link: জাল বা অনুমান করা payload ক্যাটালগ/API তে পৌঁছানোর আগেই বাতিল ---
+# BOT_TOKEN থেকে তৈরি করা হয় না: টোকেন রিভোক/রোটেট করলে চ্যানেলের সব লিংক নীরবে অচল হয়ে যেত
+LINK_CODEC = LinkTokenCodec(LINK_SECRET) if LINK_SECRET else None
+
+# --- শিডিউলড ডিলিট: ডিস্কে রাখা কিউ, একটি সুইপার ব্যাচে ডিলিট করে (রিস্টার্টেও হারায় না) ---
+DELETIONS = DeletionQueue(DELETION_DB_FILE, sweep_interval=DELETION_SWEEP_SECONDS, sender=SENDER)
+DELIVERY_INDEX = DeliveryIndex(maxsize=DELIVERY_INDEX_SIZE, ttl=DELETION_TIME_SECONDS)  # এখনও জীবিত ডেলিভারি
+
+# --- আপলোড সেশন ডিস্কে থাকে; অ্যালবামের অংশগুলো একসাথে প্রসেস হয় ---
+SESSIONS = UploadSessionStore(SESSION_DB_FILE, ttl=SESSION_TTL_SECONDS)
+ALBUMS = None  # বট তৈরি হওয়ার পর (on_startup) সেট হয়
+UPLOAD_LOCK = asyncio.Lock()  # অ্যালবাম ফ্লাশ ও একক আপলোড যেন একসাথে সেশন না বদলায়
+
+# --- ক্লিক অ্যানালিটিক্স: হট পাথে শুধু মেমরিতে গোনা, ডিস্কে ব্যাচে লেখা ---
+ANALYTICS = Analytics(ANALYTICS_DB_FILE, flush_interval=ANALYTICS_FLUSH_SECONDS, max_keys=ANALYTICS_MAX_KEYS)
 
-# --- এডমিন আপলোড শুরু ---
+# --- কোন পোস্ট চ্যানেলের কোন মেসেজ, আর চলমান ব্যাকফিল জব ---
+CHANNEL_POSTS = ChannelPostStore(CHANNEL_POSTS_DB_FILE)
+BACKFILL_JOB = None
+BACKFILL_TASK = None
+
+# --- ফ্রন্ট প্রসেসের ওয়ার্কার পুল (শুধু WORKERS > 1 হলে) ---
+WORKER_POOL = None
+FRONT_METRICS_SERVER = None
+
+# --- এডমিন আপলোড শুরু (/start_upload অথবা /start_upload_N) ---
+@timed("start_upload_command")
 async def start_upload_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """এডমিনের জন্য নতুন আপলোড সেশন শুরু করে; N দিয়ে ভিডিও সংখ্যা ঠিক হয়"""
     user_id = update.message.from_user.id
     if user_id != ADMIN_USER_ID:
         return
-    if user_id in STAGED_UPLOADS:
-        del STAGED_UPLOADS[user_id]
-    await update.message.reply_text("আপলোড শুরু হয়েছে। প্রথমত, অনুগ্রহ করে থাম্বনেইল ফটো আপলোড করুন।")
+
+    match = re.match(r"^/start_upload(?:_(\d+))?", update.message.text or "")
+    video_count = int(match.group(1)) if match and match.group(1) else 1
+    if video_count < 1:
+        await SENDER.run(PRIORITY_USER, user_id, update.message.reply_text, "ভিডিও সংখ্যা অন্তত ১ হতে হবে।")
+        return
+
+    # আগে পাঠানো অ্যালবাম থাকলে সেটি পুরনো সেশনেই যোগ হবে
+    await ALBUMS.flush_user(user_id)
+    async with UPLOAD_LOCK:
+        SESSIONS.save(user_id, {'step': 'photo', 'video_count': video_count, 'video_ids': []})
+    await SENDER.run(PRIORITY_USER, user_id, update.message.reply_text, f"আপলোড শুরু হয়েছে ({video_count}টি ভিডিও)। প্রথমত, অনুগ্রহ করে থাম্বনেইল ফটো আপলোড করুন।")
 
 # --- এডমিন ফটো আপলোড হ্যান্ডলার ---
+@timed("handle_admin_photo_upload")
 async def handle_admin_photo_upload(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """এডমিনের পাঠানো থাম্বনেইল সেভ করে এবং ভিডিওর জন্য অপেক্ষা করে"""
     user_id = update.message.from_user.id
     if user_id != ADMIN_USER_ID or not update.message.photo:
         return
-    photo_file_id = update.message.photo[-1].file_id
-    STAGED_UPLOADS[user_id] = {'photo_id': photo_file_id, 'photo_msg_id': update.message.message_id}
-    await update.message.reply_text("ছবিটি সেভ হয়েছে। এবার ভিডিওটি আপলোড করুন।")
+
+    item = {'kind': 'photo', 'file_id': update.message.photo[-1].file_id, 'message_id': update.message.message_id}
+    await receive_upload_item(update, context, item)
 
 # --- এডমিন ভিডিও আপলোড হ্যান্ডলার ---
+@timed("handle_admin_video_upload")
 async def handle_admin_video_upload(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """এডমিনের পাঠানো ভিডিওগুলো সংগ্রহ করে এবং সব ভিডিও সংগ্রহ হলে চ্যানেলে পোস্ট করে"""
     user_id = update.message.from_user.id
-    if user_id != ADMIN_USER_ID:
+    if user_id != ADMIN_USER_ID or not update.message.video:
         return
-    if user_id not in STAGED_UPLOADS or not update.message.video:
-        if update.message.video and user_id not in STAGED_UPLOADS:
-            await update.message.reply_text("ভিডিওটি আপলোড করার আগে /start_upload কমান্ড দিয়ে থাম্বনেইল আপলোড করুন।")
+
+    item = {'kind': 'video', 'file_id': update.message.video.file_id, 'message_id': update.message.message_id}
+    await receive_upload_item(update, context, item)
+
+async def receive_upload_item(update: Update, context: ContextTypes.DEFAULT_TYPE, item) -> None:
+    """অ্যালবামের অংশ হলে জমা রাখে (debounce), একক মেসেজ হলে সাথে সাথে সেশনে যোগ করে"""
+    user_id = update.message.from_user.id
+    if update.message.media_group_id:
+        ALBUMS.add(user_id, update.message.media_group_id, item)
         return
-    
-    staged_data = STAGED_UPLOADS.pop(user_id)
-    data = load_data()
-    permanent_id = data["next_id"]
-    video_file_id = update.message.video.file_id
-    photo_file_id = staged_data['photo_id']
-    
-    data["videos"][str(permanent_id)] = {"video_id": video_file_id, "photo_id": photo_file_id}
-    data["next_id"] += 1
-    save_data(data)
-    logger.info(f"নতুন ভিডিও সেভ হলো: ID {permanent_id}")
-
-    # শেয়ারযোগ্য লিংক তৈরি করা
-    payload_to_encode = f"VID_{permanent_id}"  
-    encoded_payload = base64.urlsafe_b64encode(payload_to_encode.encode('utf-8')).decode('utf-8').rstrip('=')  
+    await ALBUMS.flush_user(user_id)
+    await apply_upload_items(context.bot, user_id, [item])
+
+# --- চ্যানেল পোস্টের ক্যাপশন ও শেয়ারযোগ্য লিংক (আপলোড ও ব্যাকফিল দুটোই ব্যবহার করে) ---
+def build_channel_post(permanent_id, record):
+    """(ক্যাপশন, কিবোর্ড) ফেরত দেয়; লিংক বর্তমান BOT_USERNAME দিয়ে তৈরি হয়"""
+    encoded_payload = LINK_CODEC.encode(ACTION_VIEW, permanent_id)
     shareable_link = f"https://t.me/{BOT_USERNAME}?start={encoded_payload}"  
     keyboard = InlineKeyboardMarkup([[InlineKeyboardButton("🔥 ভিডিও দেখুন 🥵", url=shareable_link)]])  
 
-    channel_caption = """\
-╭═══════════════════
-╠ ‣ দেশি ভিডিও ‣
-╰═══════════════════
+    # *** ক্যাপশন টেক্সট সরলীকরণ করা হলো (এখানেই Syntax Error ছিল) ***
+    channel_caption = f"""\
+---
+🔥 নতুন {len(record['video_ids'])} টি ভিডিও 🔥
+---
 """
+    return channel_caption, keyboard
+
+# --- আপলোড সেশনে থাম্বনেইল/ভিডিও যোগ করা (একক মেসেজ বা পুরো অ্যালবাম একসাথে) ---
+async def apply_upload_items(bot, user_id, items) -> None:
+    """আইটেমগুলো ক্রমানুসারে সেশনে যোগ করে: একবার সেশন লেখা ও একটি প্রগ্রেস মেসেজ"""
+    async with UPLOAD_LOCK:
+        staged_data = SESSIONS.get(user_id)
+        if staged_data is None:
+            await SENDER.run(PRIORITY_USER, user_id, bot.send_message, chat_id=user_id,
+                             text="আপলোড করার আগে /start_upload বা /start_upload_N কমান্ড দিয়ে আপলোড প্রক্রিয়া শুরু করুন।")
+            return
+
+        required_count = staged_data['video_count']
+        notes = []
+        added = 0
+        for item in sorted(items, key=lambda item: item['message_id']):
+            if item['kind'] == 'photo':
+                if staged_data['step'] != 'photo':
+                    notes.append("থাম্বনেইল আগেই সেভ হয়েছে, অতিরিক্ত ছবিটি বাদ দেওয়া হলো।")
+                    continue
+                staged_data['photo_id'] = item['file_id']
+                staged_data['photo_msg_id'] = item['message_id']
+                staged_data['step'] = 'video'
+                notes.append(f"ছবিটি সেভ হয়েছে। এবার, অনুগ্রহ করে **ধারাবাহিকভাবে {required_count}টি ভিডিও** আপলোড করুন।")
+            elif staged_data['step'] != 'video':
+                # থাম্বনেইলের আগে আসা ভিডিও নেওয়া হয় না
+                continue
+            elif len(staged_data['video_ids']) >= required_count:
+                notes.append("প্রয়োজনের বেশি ভিডিও এসেছে, অতিরিক্তগুলো বাদ দেওয়া হলো।")
+            else:
+                staged_data['video_ids'].append(item['file_id'])
+                added += 1
+
+        current_count = len(staged_data['video_ids'])
+        if added:
+            notes.append(f"ভিডিও সেভ হলো: {current_count} / {required_count}")
+        SESSIONS.save(user_id, staged_data)
+        if notes:
+            await SENDER.run(PRIORITY_USER, user_id, bot.send_message, chat_id=user_id, text="\n".join(dict.fromkeys(notes)))
+
+        # সব ভিডিও সংগ্রহ হয়ে গেলে; আগের চালুতে পূর্ণ হয়ে পাবলিশ না হওয়া সেশনও এখানে পাবলিশ হয়
+        if staged_data['step'] == 'video' and current_count >= required_count:
+            await publish_upload(bot, user_id, staged_data, [item['message_id'] for item in items])
+
+async def publish_upload(bot, user_id, staged_data, message_ids) -> None:
+    """সম্পূর্ণ আপলোড ক্যাটালগে যোগ করে চ্যানেলে পোস্ট করে"""
+    required_count = staged_data['video_count']
+    permanent_id = CATALOG.add({
+        "video_ids": staged_data['video_ids'],
+        "photo_id": staged_data['photo_id']
+    })
+    # লিংক পাবলিক হওয়ার আগেই ID ডিস্কে থাকতে হবে; নাহলে ক্র্যাশের পর একই ID অন্য পোস্ট পেত
+    try:
+        await CATALOG.flush_async(raise_errors=True)
+    except OSError as e:
+        logger.error(f"ক্যাটালগ সেভ করতে ব্যর্থ, চ্যানেলে পোস্ট করা হলো না: {e}")
+        await SENDER.run(PRIORITY_USER, user_id, bot.send_message, chat_id=user_id, text=f"❌ ক্যাটালগ সেভ করা যায়নি, পোস্ট হয়নি। ত্রুটি: {e}")
+        return
+    logger.info(f"নতুন মাল্টিপল ভিডিও সেভ হলো: ID {permanent_id}, Count: {required_count}")
+
+    channel_caption, keyboard = build_channel_post(permanent_id, staged_data)
 
+    # চ্যানেলে থাম্বনেইল সহ পোস্ট করা
     try:  
-        await context.bot.send_photo(chat_id=CHANNEL_ID, photo=photo_file_id, caption=channel_caption, reply_markup=keyboard)  
-        logger.info(f"চ্যানেলে পোস্ট সফল: Channel ID {CHANNEL_ID}, Permanent ID {permanent_id}")  
+        channel_message = await SENDER.run(PRIORITY_CHANNEL, CHANNEL_ID, bot.send_photo,
+                                           chat_id=CHANNEL_ID, photo=staged_data['photo_id'], caption=channel_caption, reply_markup=keyboard)
+        # পরে লিংক/কিবোর্ড বদলাতে (ব্যাকফিল) পোস্টের মেসেজ ID মনে রাখা
+        CHANNEL_POSTS.record_post(permanent_id, CHANNEL_ID, channel_message.message_id)
+        logger.info(f"চ্যানেলে পোস্ট সফল: Permanent ID {permanent_id}")  
     except Exception as e:  
         logger.error(f"চ্যানেলে পোস্ট করতে ব্যর্থ: {e}")  
-        await update.message.reply_text(f"❌ চ্যানেলে পোস্ট ব্যর্থ হয়েছে। ত্রুটি: {e}")  
+        await SENDER.run(PRIORITY_USER, user_id, bot.send_message, chat_id=user_id, text=f"❌ চ্যানেলে পোস্ট ব্যর্থ হয়েছে। ত্রুটি: {e}")  
         return  
 
+    # এডমিনের মেসেজ ডিলিট করা
     try:  
-        await update.message.delete()  
-        await context.bot.delete_message(chat_id=user_id, message_id=staged_data['photo_msg_id'])  
+        # শেষ ব্যাচের ভিডিও মেসেজ ও থাম্বনেইল মেসেজ ডিলিট হচ্ছে
+        await SENDER.run(PRIORITY_DELETE, user_id, bot.delete_messages,
+                         chat_id=user_id, message_ids=sorted(set(message_ids) | {staged_data['photo_msg_id']}))
     except Exception as e:  
         logger.warning(f"এডমিন মেসেজ ডিলিট করতে ব্যর্থ: {e}")  
 
-    await update.message.reply_text(f"✅ সফলভাবে পোস্ট হয়েছে। স্থায়ী আইডি: {permanent_id}")
-
-# --- ইউজার /start কমান্ড ---
-async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    if not update.message:
-        return
-
-    if not context.args:
-        await update.message.reply_text("স্বাগতম! ভিডিও দেখার জন্য চ্যানেলের '🔥 ভিডিও দেখুন 🥵' বাটনে ক্লিক করুন।")
-        return
+    await SENDER.run(PRIORITY_USER, user_id, bot.send_message, chat_id=user_id, text=f"✅ সফলভাবে {required_count}টি ভিডিও পোস্ট হয়েছে। স্থায়ী আইডি: {permanent_id}")
+    SESSIONS.delete(user_id) # আপলোড প্রক্রিয়া শেষ
         
+# --- এডমিন: বাল্ক রিপোস্ট/এডিট (/backfill [edit|repost], /backfill_status, /backfill_stop) ---
+def backfill_job_name(mode):
+    """লক্ষ্য (চ্যানেল ও বট ইউজারনেম) একই থাকলে একই নাম, তাই আগের চেকপয়েন্ট থেকে চলে"""
+    return f"{mode}:{CHANNEL_ID}:{BOT_USERNAME}"
+
+def start_backfill(bot, mode) -> None:
+    """ব্যাকগ্রাউন্ডে ব্যাকফিল জব চালু করে; অগ্রগতি এডমিনের একটি মেসেজে এডিট হয়ে দেখায়"""
+    global BACKFILL_JOB, BACKFILL_TASK
+    status_message = {}
+
+    async def report(text):
+        if "id" not in status_message:
+            message = await SENDER.run(PRIORITY_USER, ADMIN_USER_ID, bot.send_message, chat_id=ADMIN_USER_ID, text=text)
+            status_message["id"] = message.message_id
+        else:
+            await SENDER.run(PRIORITY_USER, ADMIN_USER_ID, bot.edit_message_text,
+                             chat_id=ADMIN_USER_ID, message_id=status_message["id"], text=text)
+
+    BACKFILL_JOB = BackfillJob(
+        backfill_job_name(mode), mode, CHANNEL_ID, CATALOG, CHANNEL_POSTS, SENDER, bot, build_channel_post,
+        report=report, batch_size=BACKFILL_BATCH_SIZE, report_interval=BACKFILL_REPORT_SECONDS,
+    )
+    BACKFILL_TASK = asyncio.create_task(run_backfill(BACKFILL_JOB))
+
+async def run_backfill(job) -> None:
     try:
-        encoded_payload = context.args[0]
-        # Base64 ডিকোডিং এর জন্য প্যাডিং নিশ্চিত করা
-        padded_payload = encoded_payload + '=' * (4 - len(encoded_payload) % 4)
-        decoded_payload = base64.urlsafe_b64decode(padded_payload.encode('utf-8')).decode('utf-8')
-
-        if decoded_payload.startswith("VID_"):
-            permanent_id = decoded_payload.split("VID_")[1]
-            data = load_data()
-            video_data = data["videos"].get(permanent_id)
-
-            if video_data and video_data.get("video_id"):
-                video_file_id = video_data["video_id"]
-                sent_message = await update.message.reply_video(video=video_file_id, caption="🔥Successfull🥵")
-
-                if update.message.from_user.id != ADMIN_USER_ID:
-                    # ৪ ঘন্টা পর ডিলিট করার জন্য শিডিউল করা
-                    context.job_queue.run_once(delete_scheduled_message, when=DELETION_TIME_SECONDS,
-                                            data={'chat_id': sent_message.chat_id, 'message_id': sent_message.message_id})
-                    logger.info(f"ভিডিও ডিলিট শিডিউল করা হলো: ID {permanent_id}")
-                else:
-                    logger.info(f"এডমিন হওয়ায় ডিলিট শিডিউল করা হলো না: ID {permanent_id}")
-                return
-            
-            await update.message.reply_text("দুঃখিত, এই ভিডিওটির ফাইল খুঁজে পাওয়া যায়নি।")
-            
+        await job.run()
+    except asyncio.CancelledError:
+        logger.info(f"ব্যাকফিল {job.name} থামানো হলো; আবার /backfill {job.mode} দিলে চেকপয়েন্ট থেকে চলবে")
+        raise
     except Exception as e:
-        logger.error(f"স্টার্ট কমান্ড প্রসেস করতে ব্যর্থ: {e}")
-        await update.message.reply_text("দুঃখিত, লিংকে কোনো সমস্যা আছে।")
+        logger.error(f"ব্যাকফিল {job.name} ব্যর্থ: {e}")
 
-
-# --- মেইন ফাংশন ---
-def main() -> None:
-    # কনফিগারেশন ত্রুটি হ্যান্ডলিং
-    if not BOT_TOKEN or ADMIN_USER_ID == 0 or CHANNEL_ID == 0:
-        logger.error("🛑 গুরুতর কনফিগারেশন ত্রুটি: BOT_TOKEN, ADMIN_USER_ID, বা CHANNEL_ID Environment Variables এ সেট করা নেই বা অবৈধ মান রয়েছে।")
-        print("🛑 গুরুতর কনফিগারেশন ত্রুটি: Railway Variables চেক করুন।")
+@timed("backfill_command")
+async def backfill_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """সব পোস্টের লিংক/কিবোর্ড নতুন করে বানিয়ে চ্যানেলে এডিট (edit) বা নতুন চ্যানেলে পোস্ট (repost) করে"""
+    user_id = update.message.from_user.id
+    if user_id != ADMIN_USER_ID:
         return
 
-    logging.getLogger('httpx').setLevel(logging.WARNING)
-    application = Application.builder().token(BOT_TOKEN).build()
-
-    # হ্যান্ডলার যুক্ত করা
-    application.add_handler(CommandHandler("start", start_command))  
-    application.add_handler(CommandHandler("start_upload", start_upload_command))  
-    application.add_handler(MessageHandler(filters.PHOTO & filters.User(ADMIN_USER_ID) & (~filters.COMMAND), handle_admin_photo_upload))  
-    application.add_handler(MessageHandler(filters.VIDEO & filters.User(ADMIN_USER_ID) & (~filters.COMMAND), handle_admin_video_upload))  
+    mode = context.args[0].lower() if context.args else "edit"
+    if mode not in BACKFILL_MODES:
+        await SENDER.run(PRIORITY_USER, user_id, update.message.reply_text,
+                         "ব্যবহার: /backfill edit (বর্তমান চ্যানেলের পোস্টের লিংক বদলানো) অথবা /backfill repost (নতুন চ্যানেলে সব পোস্ট)")
+        return
+    if BACKFILL_TASK is not None and not BACKFILL_TASK.done():
+        await SENDER.run(PRIORITY_USER, user_id, update.message.reply_text, "একটি ব্যাকফিল ইতিমধ্যে চলছে।\n\n" + BACKFILL_JOB.progress_text())
+        return
+    start_backfill(context.bot, mode)
 
-    print("🔥 বট চালু হয়েছে — এডমিন এখন /start_upload কমান্ড দিয়ে থাম্বনেইল ও ভিডিও আপলোড করতে পারবেন।")  
-    application.run_polling(poll_interval=3.0)
+@timed("backfill_status_command")
+async def backfill_status_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    user_id = update.message.from_user.id
+    if user_id != ADMIN_USER_ID:
+        return
+    text = BACKFILL_JOB.progress_text() if BACKFILL_JOB is not None else "এই প্রসেসে কোনো ব্যাকফিল চালানো হয়নি।"
+    await SENDER.run(PRIORITY_USER, user_id, update.message.reply_text, text)
 
-if __name__ == "__main__":
-    main()    if user_id not in STAGED_UPLOADS or STAGED_UPLOADS[user_id]['step'] != 'photo':
-        await update.message.reply_text("ছবি আপলোড করার আগে /start_upload বা /start_upload_N কমান্ড দিয়ে আপলোড প্রক্রিয়া শুরু করুন।")
+@timed("backfill_stop_command")
+async def backfill_stop_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    user_id = update.message.from_user.id
+    if user_id != ADMIN_USER_ID:
+        return
+    if BACKFILL_TASK is None or BACKFILL_TASK.done():
+        await SENDER.run(PRIORITY_USER, user_id, update.message.reply_text, "কোনো ব্যাকফিল চলছে না।")
         return
+    BACKFILL_TASK.cancel()
+    await SENDER.run(PRIORITY_USER, user_id, update.message.reply_text, "ব্যাকফিল থামানো হলো। আবার চালালে শেষ চেকপয়েন্ট থেকে শুরু হবে।")
 
-    photo_file_id = update.message.photo[-1].file_id
-    STAGED_UPLOADS[user_id]['photo_id'] = photo_file_id
-    STAGED_UPLOADS[user_id]['photo_msg_id'] = update.message.message_id
-    STAGED_UPLOADS[user_id]['step'] = 'video'
-    
-    count = STAGED_UPLOADS[user_id]['video_count']
-    await update.message.reply_text(f"ছবিটি সেভ হয়েছে। এবার, অনুগ্রহ করে **ধারাবাহিকভাবে {count}টি ভিডিও** আপলোড করুন।")
+# --- এডমিন: /stats [ঘন্টা] — টপ ভিডিও ও কনভার্শন রেট ---
+def percent(part, whole):
+    return f"{part / whole * 100:.1f}%" if whole else "—"
 
-# --- এডমিন ভিডিও আপলোড হ্যান্ডলার ---
-async def handle_admin_video_upload(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """এডমিনের পাঠানো ভিডিওগুলো সংগ্রহ করে এবং সব ভিডিও সংগ্রহ হলে চ্যানেলে পোস্ট করে"""
+@timed("stats_command")
+async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """ঘন্টাভিত্তিক সারাংশ থেকে দেখা → আনলক কনভার্শন, ব্যর্থতা ও টপ ভিডিও দেখায়"""
     user_id = update.message.from_user.id
-    if user_id != ADMIN_USER_ID or not update.message.video:
+    if user_id != ADMIN_USER_ID:
         return
-    
-    if user_id not in STAGED_UPLOADS or STAGED_UPLOADS[user_id]['step'] != 'video':
-        # যদি ভিডিও আসে কিন্তু আপলোড প্রক্রিয়া শুরু হয়নি
-        if update.message.video and user_id not in STAGED_UPLOADS:
-            await update.message.reply_text("ভিডিও আপলোড করার আগে /start_upload কমান্ড দিয়ে শুরু করুন।")
+
+    try:
+        hours = max(1, int(context.args[0])) if context.args else 24
+    except ValueError:
+        await SENDER.run(PRIORITY_USER, user_id, update.message.reply_text, "ব্যবহার: /stats অথবা /stats <ঘন্টা>")
         return
 
-    staged_data = STAGED_UPLOADS[user_id]
-    video_file_id = update.message.video.file_id
-    staged_data['video_ids'].append(video_file_id)
-    
-    current_count = len(staged_data['video_ids'])
-    required_count = staged_data['video_count']
-    
-    await update.message.reply_text(f"ভিডিও সেভ হলো: {current_count} / {required_count}")
+    (views, unlocks, failures, replays), top = ANALYTICS.summary(hours=hours, limit=10)
+    lines = [
+        f"📊 শেষ {hours} ঘন্টার পরিসংখ্যান",
+        f"লকড দেখা: {views}, আনলক: {unlocks} (কনভার্শন {percent(unlocks, views)})",
+        f"ব্যর্থ ডেলিভারি: {failures} ({percent(failures, views + unlocks + failures)}), রিপিট ক্লিক: {replays}",
+    ]
+    if top:
+        lines.append("\nটপ ভিডিও:")
+        for rank, (permanent_id, video_views, video_unlocks, video_failures, _) in enumerate(top, 1):
+            lines.append(f"{rank}. ID {permanent_id} — দেখা {video_views}, আনলক {video_unlocks} "
+                         f"({percent(video_unlocks, video_views)}), ব্যর্থ {video_failures}")
+    await SENDER.run(PRIORITY_USER, user_id, update.message.reply_text, "\n".join(lines))
+
+# --- deep-link রিজলভ ও রিপ্লাই তৈরি (ফলাফল LINK_CACHE এ রাখা হয়) ---
+def decode_payload(encoded_payload, user_id):
+    """payload থেকে (permanent_id, is_unlocked, bound_user_id, expires_at) বের করে; জাল বা অবৈধ হলে ValueError
+
+    আনলক টোকেন শুধু যে ইউজারের জন্য সাইন করা তার জন্যই বৈধ (bound_user_id); ক্যাশ hit এও এটি ও মেয়াদ যাচাই হয়।
+    """
+    # base64("VID_"/"UNLOCK_") সবসময় 'V' দিয়ে শুরু হয়, সাইন করা টোকেন 'E'-'H' দিয়ে
+    if encoded_payload.startswith("V"):
+        if not LEGACY_LINKS:
+            raise InvalidToken("legacy")
+        permanent_id, is_unlocked = decode_legacy_payload(encoded_payload)
+        # সাইন করা লিংক চালুর পরের পোস্টের legacy লিংক কখনও প্রকাশিত হয়নি: অনুমান করা ID, ক্যাটালগ লুকআপের আগেই বাতিল
+        if LEGACY_CUTOFF is not None and int(permanent_id) >= LEGACY_CUTOFF:
+            raise InvalidToken("legacy_cutoff")
+        return permanent_id, is_unlocked, None, None
+
+    action, permanent_id, expires_at = LINK_CODEC.decode(encoded_payload, user_id=user_id)
+    if action == ACTION_VIEW:
+        return str(permanent_id), False, None, None
+    if action == ACTION_UNLOCK:
+        # মেয়াদ পার হওয়া আনলক লিংক আবার অ্যাড দেখার ধাপে যায়
+        if LINK_CODEC.expired(expires_at):
+            return str(permanent_id), False, user_id, None
+        return str(permanent_id), True, user_id, expires_at
+    raise InvalidToken("action")
+
+def decode_legacy_payload(encoded_payload):
+    """আগে প্রকাশিত সাইনবিহীন base64 লিংক; UNLOCK_ জাল করা যায় বলে সেটি শুধু লকড অবস্থা দেখায়"""
+    padded_payload = encoded_payload + '=' * (-len(encoded_payload) % 4)
+    decoded_payload = base64.urlsafe_b64decode(padded_payload.encode('utf-8')).decode('utf-8')
+    for prefix in ("VID_", "UNLOCK_"):
+        if decoded_payload.startswith(prefix):
+            permanent_id = decoded_payload[len(prefix):]
+            if permanent_id.isdigit():
+                return permanent_id, False
+    raise ValueError(decoded_payload)
+
+def build_link_reply(permanent_id, is_unlocked, video_data, user_id=None, expires_at=None):
+    """অ্যাড কীবোর্ড, লকড ক্যাপশন ও MediaGroup একবার তৈরি করে LinkReply এ রাখে"""
+    video_ids = video_data['video_ids']
+    reply = LinkReply(permanent_id, is_unlocked, video_data, user_id=user_id, expires_at=expires_at)
 
-    # সব ভিডিও সংগ্রহ হয়ে গেলে
-    if current_count == required_count:
-        data = load_data()
-        permanent_id = data["next_id"]
-        
-        # ডাটা সেভ করা
-        data["videos"][str(permanent_id)] = {
-            "video_ids": staged_data['video_ids'], 
-            "photo_id": staged_data['photo_id']
-        }
-        data["next_id"] += 1
-        save_data(data)
-        logger.info(f"নতুন মাল্টিপল ভিডিও সেভ হলো: ID {permanent_id}, Count: {required_count}")
-
-        # --- শেয়ারযোগ্য লিংক তৈরি করা ---
-        payload_to_encode = f"VID_{permanent_id}"  
-        encoded_payload = base64.urlsafe_b64encode(payload_to_encode.encode('utf-8')).decode('utf-8').rstrip('=')  
-        shareable_link = f"https://t.me/{BOT_USERNAME}?start={encoded_payload}"  
-        keyboard = InlineKeyboardMarkup([[InlineKeyboardButton("🔥 ভিডিও দেখুন 🥵", url=shareable_link)]])  
-
-        # *** ক্যাপশন টেক্সট সরলীকরণ করা হলো (এখানেই Syntax Error ছিল) ***
-        channel_caption = f"""\
----
-🔥 নতুন {required_count} টি ভিডিও 🔥
----
-"""
+    # লকড অবস্থার জন্য (এডমিন VID_ লিংকেও সরাসরি ভিডিও পায়, তাই দুটোই তৈরি রাখা হয়)
+    if not is_unlocked:
+        # ইউজারকে অ্যাড দেখতে পাঠানোর বাটন
+        reply.ad_keyboard = InlineKeyboardMarkup([[
+            InlineKeyboardButton("🌐 অ্যাড দেখুন এবং ভিডিও আনলক করুন", url=f"{AD_URL}")
+        ]])
+
+        reply.locked_caption = f"🚨 ভিডিও লকড! 🚨\n\nভিডিওগুলো আনলক করতে নিচের বাটনে ক্লিক করে অ্যাডটি দেখুন।\n\nভিডিও সংখ্যা: {len(video_ids)}"
+
+    # ভিডিওগুলো ≤10 টির MediaGroup অংশে পাঠানো হবে
+    reply.media_chunks = build_media_chunks(video_ids)
+    return reply
+
+def build_unlock_keyboard(permanent_id, user_id):
+    """আনলক করার বাটন; টোকেনটি এই ইউজারের জন্য সাইন করা ও মেয়াদযুক্ত, তাই ক্যাশ না করে প্রতিবার তৈরি হয়"""
+    lock_key = LINK_CODEC.encode(ACTION_UNLOCK, permanent_id, expires_at=time.time() + UNLOCK_LINK_TTL, user_id=user_id)
+    return InlineKeyboardMarkup([[
+        InlineKeyboardButton("✅ আনলক করুন এবং ভিডিও দেখুন", url=f"https://t.me/{BOT_USERNAME}?start={lock_key}")
+    ]])
+
+# --- রিপিট ক্লিক: পুরোটা আবার না পাঠিয়ে আগের মেসেজের দিকে ইঙ্গিত ---
+async def send_replay_pointer(update, user_id, permanent_id, kind, text, reply_markup=None) -> bool:
+    """আগে পাঠানো মেসেজ এখনও থাকলে সেটির রিপ্লাই হিসেবে ছোট একটি মেসেজ পাঠায়; না পারলে False"""
+    entry = DELIVERY_INDEX.lookup(user_id, permanent_id, kind)
+    chat_id = update.message.chat_id
+    if entry is None or entry[0] != chat_id:
+        return False
+    _, message_ids, remaining = entry
+    try:
+        pointer = await SENDER.run(
+            PRIORITY_USER, chat_id, update.message.reply_text, text,
+            reply_to_message_id=message_ids[0], allow_sending_without_reply=False, reply_markup=reply_markup
+        )
+    except TelegramError as e:
+        # ইউজার নিজে মেসেজ মুছে ফেললে রিপ্লাই ব্যর্থ হয়; তখন পুরোটা আবার পাঠানো হবে
+        logger.info(f"আগের ডেলিভারি পাওয়া যায়নি, আবার পাঠানো হচ্ছে (User {user_id}): {e}")
+        DELIVERY_INDEX.forget(user_id, permanent_id, kind)
+        return False
+    # পয়েন্টারটিও মূল মেসেজগুলোর সাথেই ডিলিট হবে
+    DELETIONS.schedule(chat_id, [pointer.message_id], remaining)
+    DELIVERY_REPLAYS.inc(kind)
+    ANALYTICS.record(permanent_id, "replays")
+    logger.log(DELIVERY_LOG_LEVEL, "রিপিট ক্লিক, আগের মেসেজ দেখানো হলো: ID %s to User %s", permanent_id, user_id)
+    return True
 
-        # চ্যানেলে থাম্বনেইল সহ পোস্ট করা
-        try:  
-            await context.bot.send_photo(chat_id=CHANNEL_ID, photo=staged_data['photo_id'], caption=channel_caption, reply_markup=keyboard)  
-            logger.info(f"চ্যানেলে পোস্ট সফল: Permanent ID {permanent_id}")  
-        except Exception as e:  
-            logger.error(f"চ্যানেলে পোস্ট করতে ব্যর্থ: {e}")  
-            await update.message.reply_text(f"❌ চ্যানেলে পোস্ট ব্যর্থ হয়েছে। ত্রুটি: {e}")  
-            return  
-
-        # এডমিনের মেসেজ ডিলিট করা
-        try:  
-            # এখানে শুধু ভিডিও মেসেজ ডিলিট হচ্ছে, photo_msg_id অন্য জায়গায় সেভ করা আছে
-            await update.message.delete()  
-            await context.bot.delete_message(chat_id=user_id, message_id=staged_data['photo_msg_id'])
-        except Exception as e:  
-            logger.warning(f"এডমিন মেসেজ ডিলিট করতে ব্যর্থ: {e}")  
-
-        await update.message.reply_text(f"✅ সফলভাবে {required_count}টি ভিডিও পোস্ট হয়েছে। স্থায়ী আইডি: {permanent_id}")
-        del STAGED_UPLOADS[user_id] # আপলোড প্রক্রিয়া শেষ
-        
 # --- ইউজার /start কমান্ড (লকড/আনলকড ভিডিও প্লেয়ার) ---
+@timed("start_command")
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """ইউজার যখন শেয়ার করা লিংকে ক্লিক করে তখন ভিডিওগুলো লক বা আনলকড অবস্থায় পাঠায়"""
+    """ইউজার যখন শেয়ার করা লিংকে ক্লিক করে তখন ভিডিওগুলো লক বা আনলকড অবস্থায় পাঠায়"""
     if not update.message:
         return
 
@@ -279,117 +511,342 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     
     # 1. payload যাচাই
     if not context.args:
-        await update.message.reply_text("স্বাগতম! ভিডিও দেখার জন্য চ্যানেলের '🔥 ভিডিও দেখুন 🥵' বাটনে ক্লিক করুন।")
+        await SENDER.run(PRIORITY_USER, chat_id, update.message.reply_text, "স্বাগতম! ভিডিও দেখার জন্য চ্যানেলের '🔥 ভিডিও দেখুন 🥵' বাটনে ক্লিক করুন।")
         return
         
     encoded_payload = context.args[0]
-    padded_payload = encoded_payload + '=' * (4 - len(encoded_payload) % 4)
-    
-    try:
-        decoded_payload = base64.urlsafe_b64decode(padded_payload.encode('utf-8')).decode('utf-8')
-        if not decoded_payload.startswith("VID_") and not decoded_payload.startswith("UNLOCK_"):
-            raise ValueError
-    except Exception:
-        await update.message.reply_text("দুঃখিত, লিংকে কোনো সমস্যা আছে।")
-        return
-    
-    # payload থেকে পার্মানেন্ট ID বের করা
-    if decoded_payload.startswith("VID_"):
-        permanent_id = decoded_payload.split("VID_")[1]
-        is_unlocked = False # VID_ মানেই লকড অবস্থায় আছে
-    elif decoded_payload.startswith("UNLOCK_"):
-        permanent_id = decoded_payload.split("UNLOCK_")[1]
-        is_unlocked = True # UNLOCK_ মানে অ্যাড দেখে ফিরে এসেছে
+    link = LINK_CACHE.get(encoded_payload, user_id)
+    if link is None:
+        try:
+            permanent_id, is_unlocked, bound_user_id, expires_at = decode_payload(encoded_payload, user_id)
+        except Exception:
+            # জাল/অনুমান করা লিংকের জন্য কোনো API কলও নয়, শুধু গণনা
+            INVALID_LINKS.inc()
+            return
 
+        video_data = CATALOG.get(permanent_id)
 
-    data = load_data()
-    video_data = data["videos"].get(permanent_id)
+        if not video_data or not video_data.get("video_ids"):
+            CATALOG_MISSES.inc()
+            await SENDER.run(PRIORITY_USER, chat_id, update.message.reply_text, "দুঃখিত, এই ভিডিওটির ফাইল খুঁজে পাওয়া যায়নি।")
+            return
 
-    if not video_data or not video_data.get("video_ids"):
-        await update.message.reply_text("দুঃখিত, এই ভিডিওটির ফাইল খুঁজে পাওয়া যায়নি।")
-        return
+        link = build_link_reply(permanent_id, is_unlocked, video_data, user_id=bound_user_id, expires_at=expires_at)
+        LINK_CACHE.put(encoded_payload, link)
 
-    video_ids = video_data['video_ids']
+    permanent_id = link.permanent_id
+    is_unlocked = link.is_unlocked
     
-    # 2. ভিডিও লক অবস্থায় পাঠানো (ছবি সহ বাটন)
+    # 2. ভিডিও লক অবস্থায় পাঠানো (ছবি সহ বাটন)
     if not is_unlocked and user_id != ADMIN_USER_ID:
-        
-        # Base64 দিয়ে UNLOCK_ কী তৈরি করা
-        lock_key = base64.urlsafe_b64encode(f"UNLOCK_{permanent_id}".encode('utf-8')).decode('utf-8').rstrip('=')
-        
-        # ইউজারকে অ্যাড দেখতে পাঠানোর বাটন
-        ad_keyboard = InlineKeyboardMarkup([[
-            InlineKeyboardButton("🌐 অ্যাড দেখুন এবং ভিডিও আনলক করুন", url=f"{AD_URL}")
-        ]])
-        
-        # আনলক করার জন্য একটি বাটন
-        unlock_keyboard = InlineKeyboardMarkup([[
-            InlineKeyboardButton("✅ আনলক করুন এবং ভিডিও দেখুন", url=f"https://t.me/{BOT_USERNAME}?start={lock_key}")
-        ]])
+        # আগেই আনলক করা থাকলে ভিডিওগুলো, না হলে আগের লকড মেসেজ দেখিয়ে দেওয়া
+        if await send_replay_pointer(update, user_id, permanent_id, "unlocked", "☝️ আপনার আনলক করা ভিডিওগুলো উপরে আছে।"):
+            return
+        unlock_keyboard = build_unlock_keyboard(permanent_id, user_id)
+        if await send_replay_pointer(
+            update, user_id, permanent_id, "locked",
+            "☝️ ভিডিওটি উপরে আছে। অ্যাড দেখে আসার পর নিচের বাটনটি ক্লিক করুন:", reply_markup=unlock_keyboard
+        ):
+            return
 
-        locked_caption = f"🚨 ভিডিও লকড! 🚨\n\nভিডিওগুলো আনলক করতে নিচের বাটনে ক্লিক করে অ্যাডটি দেখুন।\n\nভিডিও সংখ্যা: {len(video_ids)}"
-        
         try:
             # থাম্বনেইল সহ লকড মেসেজ পাঠানো
-            sent_message = await update.message.reply_photo(
-                photo=video_data['photo_id'], 
-                caption=locked_caption, 
-                reply_markup=ad_keyboard
+            sent_message = await SENDER.run(
+                PRIORITY_USER, chat_id, update.message.reply_photo,
+                photo=link.record['photo_id'], 
+                caption=link.locked_caption, 
+                reply_markup=link.ad_keyboard
             )
-            context.job_queue.run_once(delete_scheduled_message, when=DELETION_TIME_SECONDS,
-                                    data={'chat_id': sent_message.chat_id, 'message_id': sent_message.message_id})
+            DELETIONS.schedule(sent_message.chat_id, [sent_message.message_id], DELETION_TIME_SECONDS)
+            DELIVERY_INDEX.record(user_id, permanent_id, "locked", sent_message.chat_id, [sent_message.message_id])
+            # ছবি সফলভাবে গেলেই কেবল ভিউ হিসেবে গোনা
+            DELIVERIES.inc("locked")
+            ANALYTICS.record(permanent_id, "views")
+            logger.log(DELIVERY_LOG_LEVEL, "লকড ভিডিও পাঠানো হলো: ID %s to User %s", permanent_id, user_id)
         except Exception as e:
+            DELIVERY_FAILURES.inc("locked")
+            ANALYTICS.record(permanent_id, "failures")
             logger.error(f"লকড মেসেজ/ছবি পাঠাতে ব্যর্থ: {e}")
-            await update.message.reply_text("ভিডিও লকড। আনলক করতে নিচের লিংকে যান।", reply_markup=ad_keyboard)
-        
-        await update.message.reply_text("ওয়েবসাইট থেকে অ্যাড দেখে আসার পর নিচের বাটনটি ক্লিক করুন:", reply_markup=unlock_keyboard)
+            await SENDER.run(PRIORITY_USER, chat_id, update.message.reply_text, "ভিডিও লকড। আনলক করতে নিচের লিংকে যান।", reply_markup=link.ad_keyboard)
 
-        logger.info(f"লকড ভিডিও পাঠানো হলো: ID {permanent_id} to User {user_id}")
+        await SENDER.run(PRIORITY_USER, chat_id, update.message.reply_text, "ওয়েবসাইট থেকে অ্যাড দেখে আসার পর নিচের বাটনটি ক্লিক করুন:", reply_markup=unlock_keyboard)
         return
 
     # 3. ভিডিও আনলকড/এডমিন হলে
-    
-    # ভিডিওগুলো MediaGroup হিসেবে পাঠানো হচ্ছে
-    media_group = []
-    for i, file_id in enumerate(video_ids):
-        # প্রথম ভিডিওতে ক্যাপশন দেওয়া হচ্ছে
-        caption = f"🎬 ভিডিও {i+1} / {len(video_ids)}" if i == 0 else ""
-        media_group.append(InputMediaVideo(media=file_id, caption=caption))
-        
+    if user_id != ADMIN_USER_ID and await send_replay_pointer(
+        update, user_id, permanent_id, "unlocked", "☝️ আপনার ভিডিওগুলো উপরে আছে।"
+    ):
+        return
+
     try:
         # সফলভাবে আনলক হওয়ার মেসেজ
         if is_unlocked and user_id != ADMIN_USER_ID:
-            await update.message.reply_text("✅ আনলক সফল! নিচে আপনার ভিডিওগুলো দেখা যাচ্ছে।", reply_markup=telegram.ReplyKeyboardRemove())
+            await SENDER.run(PRIORITY_USER, chat_id, update.message.reply_text, "✅ আনলক সফল! নিচে আপনার ভিডিওগুলো দেখা যাচ্ছে।", reply_markup=REMOVE_KEYBOARD)
 
 
-        sent_messages = await context.bot.send_media_group(chat_id=chat_id, media=media_group)
-        logger.info(f"আনলকড ভিডিও পাঠানো সফল: ID {permanent_id} to User {user_id}")
+        # বড় অ্যালবাম ≤10 এর অংশে ক্রমানুসারে যায়
+        result = await deliver_media_chunks(SENDER, context.bot, chat_id, link.media_chunks)
 
         if user_id != ADMIN_USER_ID:
             # সব মেসেজ ৪ ঘন্টা পর ডিলিট করার জন্য শিডিউল করা
-            for sent_message in sent_messages:
-                context.job_queue.run_once(delete_scheduled_message, when=DELETION_TIME_SECONDS,
-                                        data={'chat_id': sent_message.chat_id, 'message_id': sent_message.message_id})
+            DELETIONS.schedule(chat_id, result.message_ids, DELETION_TIME_SECONDS)
+
+        if not result.ok:
+            raise RuntimeError(f"{len(result.failed_chunks)}/{len(link.media_chunks)} টি অংশ পাঠানো যায়নি")
+        if user_id != ADMIN_USER_ID:
+            DELIVERY_INDEX.record(user_id, permanent_id, "unlocked", chat_id, result.message_ids)
+            ANALYTICS.record(permanent_id, "unlocks")
+        DELIVERIES.inc("admin" if user_id == ADMIN_USER_ID else "unlocked")
+        logger.log(DELIVERY_LOG_LEVEL, "আনলকড ভিডিও পাঠানো সফল: ID %s to User %s", permanent_id, user_id)
     except Exception as e:
+        DELIVERY_FAILURES.inc("admin" if user_id == ADMIN_USER_ID else "unlocked")
+        if user_id != ADMIN_USER_ID:
+            ANALYTICS.record(permanent_id, "failures")
         logger.error(f"MediaGroup পাঠাতে ব্যর্থ: {e}")
-        await update.message.reply_text("ভিডিও পাঠাতে সমস্যা হয়েছে।")
+        await SENDER.run(PRIORITY_USER, chat_id, update.message.reply_text, "ভিডিও পাঠাতে সমস্যা হয়েছে।")
+
+
+# --- অ্যাপ্লিকেশন লাইফসাইকেল ---
+async def on_startup(application: Application) -> None:
+    """ব্যাকগ্রাউন্ড সার্ভিস চালু করে"""
+    global ALBUMS
+    await CATALOG.start()
+    await SENDER.start()
+    if WORKER_INDEX == 0:
+        # ডিলিট কিউ সব ওয়ার্কারের শেয়ার করা; একজন সুইপ করলেই যথেষ্ট (নাহলে একই মেসেজ বারবার ডিলিট হবে)
+        await DELETIONS.start(application.bot)
+    await ANALYTICS.start()
+    ALBUMS = AlbumCollector(functools.partial(apply_upload_items, application.bot), debounce=ALBUM_DEBOUNCE_SECONDS)
+    if METRICS_SERVER is not None:
+        await METRICS_SERVER.start()
+
+    # ক্র্যাশ/রিডিপ্লয়ে থেমে যাওয়া ব্যাকফিল এডমিনকে জানানো (এডমিনের আপডেট যে ওয়ার্কারে যায় শুধু সেটি)
+    if worker_for(ADMIN_USER_ID, WORKERS) != WORKER_INDEX:
+        return
+    for name in CHANNEL_POSTS.unfinished_jobs():
+        mode = name.split(":", 1)[0]
+        if name == backfill_job_name(mode):
+            logger.warning(f"অসম্পূর্ণ ব্যাকফিল পাওয়া গেছে: {name}")
+            await SENDER.run(PRIORITY_USER, ADMIN_USER_ID, application.bot.send_message, chat_id=ADMIN_USER_ID,
+                             text=f"⚠️ অসম্পূর্ণ ব্যাকফিল ({mode}) পাওয়া গেছে। /backfill {mode} দিলে শেষ চেকপয়েন্ট থেকে চলবে।")
+
+async def on_stop(application: Application) -> None:
+    """আপডেট প্রসেসিং থামার পর, বট বন্ধ হওয়ার আগে: বাকি অ্যালবাম পাবলিশ ও সেন্ড কিউ খালি করা"""
+    if BACKFILL_TASK is not None and not BACKFILL_TASK.done():
+        # শেষ ব্যাচের চেকপয়েন্ট ডিস্কে আছে; পরে সেখান থেকে চলবে
+        BACKFILL_TASK.cancel()
+        await asyncio.gather(BACKFILL_TASK, return_exceptions=True)
+    if ALBUMS is not None:
+        # অর্ধেক সংগ্রহ করা অ্যালবাম সেশনে লিখে রাখা (পূর্ণ হলে পাবলিশ)
+        await ALBUMS.flush_all()
+    await DELETIONS.stop()
+    await SENDER.stop()
+
+async def on_shutdown(application: Application) -> None:
+    """বন্ধ হওয়ার আগে বাকি ডাটা ডিস্কে লিখে দেয় (বটের HTTP ক্লায়েন্ট এখানে আর চালু নেই)"""
+    if METRICS_SERVER is not None:
+        await METRICS_SERVER.stop()
+    DELETIONS.close()
+    await ANALYTICS.stop()
+    await CATALOG.stop()
+    SESSIONS.close()
+    CHANNEL_POSTS.close()
+    logger.info(f"লিংক ক্যাশ পরিসংখ্যান: {LINK_CACHE.stats()}")
+    logger.info(f"রিপিট-ক্লিক ইনডেক্স পরিসংখ্যান: {DELIVERY_INDEX.stats()}")
+
+
+# --- আপডেট গ্রহণ: webhook অথবা polling ---
+def webhook_secret_token():
+    """কনফিগার করা সিক্রেট, না থাকলে BOT_TOKEN থেকে স্থায়ী একটি সিক্রেট তৈরি করে"""
+    if WEBHOOK_SECRET_TOKEN:
+        return WEBHOOK_SECRET_TOKEN
+    return hashlib.sha256(f"webhook:{BOT_TOKEN}".encode('utf-8')).hexdigest()
+
+def run_bot(application: Application) -> None:
+    """BOT_MODE অনুযায়ী webhook সার্ভার অথবা long-polling চালু করে"""
+    if BOT_MODE == "webhook":
+        if not WEBHOOK_URL:
+            logger.error("🛑 webhook মোডে WEBHOOK_URL সেট করা নেই; polling মোডে চালু হচ্ছে।")
+        else:
+            webhook_url = f"{WEBHOOK_URL.rstrip('/')}/{WEBHOOK_PATH}"
+            logger.info(f"webhook মোড: {WEBHOOK_LISTEN}:{WEBHOOK_PORT}/{WEBHOOK_PATH}")
+            application.run_webhook(
+                listen=WEBHOOK_LISTEN,
+                port=WEBHOOK_PORT,
+                url_path=WEBHOOK_PATH,
+                webhook_url=webhook_url,
+                secret_token=webhook_secret_token(),
+                max_connections=WEBHOOK_MAX_CONNECTIONS,
+                allowed_updates=ALLOWED_UPDATES,
+            )
+            return
+    elif BOT_MODE != "polling":
+        logger.warning(f"অজানা BOT_MODE '{BOT_MODE}', polling মোডে চালু হচ্ছে।")
+
+    logger.info(f"polling মোড: interval {POLL_INTERVAL}s, long-poll timeout {POLL_TIMEOUT}s")
+    application.run_polling(
+        poll_interval=POLL_INTERVAL,
+        timeout=POLL_TIMEOUT,
+        allowed_updates=ALLOWED_UPDATES,
+    )
+
+
+# --- মাল্টি-প্রসেস মোড: ফ্রন্ট প্রসেস ---
+def update_routing_key(update: Update) -> int:
+    """একই ইউজারের সব আপডেট একই ওয়ার্কারে যায় (এডমিন আপলোড সেশন, অ্যালবাম, রিপিট-ক্লিক ইনডেক্স)"""
+    if update.effective_user is not None:
+        return update.effective_user.id
+    if update.effective_chat is not None:
+        return update.effective_chat.id
+    return update.update_id
+
+async def forward_update(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """ফ্রন্ট প্রসেস নিজে কিছু হ্যান্ডেল করে না, শুধু আপডেট ওয়ার্কারে পাঠায়"""
+    WORKER_POOL.dispatch(update_routing_key(update), update.to_dict())
+
+async def on_front_startup(application: Application) -> None:
+    global WORKER_POOL, FRONT_METRICS_SERVER
+    socket_dir = WORKER_SOCKET_DIR or tempfile.mkdtemp(prefix="bot-workers-")
+    WORKER_POOL = WorkerPool(WORKERS, socket_dir, [sys.executable, os.path.abspath(__file__)],
+                             queue_size=WORKER_QUEUE_SIZE)
+    await WORKER_POOL.start()
+    # ফ্রন্টের নিজের মেট্রিক (বাদ পড়া/হারানো আপডেট) ওয়ার্কারদের পোর্টের পরের পোর্টে
+    if METRICS_PORT:
+        WORKER_QUEUE_DEPTH.set_function(WORKER_POOL.depth)
+        FRONT_METRICS_SERVER = MetricsServer(METRICS_HOST, METRICS_PORT + WORKERS)
+        await FRONT_METRICS_SERVER.start()
+
+async def on_front_shutdown(application: Application) -> None:
+    """কিউতে থাকা আপডেট পাঠানো শেষ হলে ওয়ার্কারগুলো নিজেদের কাজ শেষ করে বন্ধ হয়"""
+    if WORKER_POOL is not None:
+        await WORKER_POOL.stop()
+    if FRONT_METRICS_SERVER is not None:
+        await FRONT_METRICS_SERVER.stop()
+
+def build_front_application() -> Application:
+    application = (
+        application_builder()
+        .token(BOT_TOKEN)
+        .update_queue(asyncio.Queue(maxsize=UPDATE_QUEUE_SIZE))
+        .post_init(on_front_startup)
+        .post_shutdown(on_front_shutdown)
+        .build()
+    )
+    # ক্রমানুসারে ফরোয়ার্ড (concurrent_updates নেই), তাই একই ইউজারের আপডেটের ক্রম ঠিক থাকে
+    application.add_handler(TypeHandler(Update, forward_update))
+    return application
+
+def run_front() -> None:
+    """আপডেট গ্রহণ (polling/webhook) করে WORKERS টি ওয়ার্কার প্রসেসে ভাগ করে দেয়"""
+    # পুরনো JSON থেকে ইমপোর্ট দরকার হলে এখানে একবার হয়, ওয়ার্কাররা একসাথে চেষ্টা করে না
+    open_storage(CATALOG_BACKEND, DATA_FILE, CATALOG_DB_FILE).close()
+    application = build_front_application()
+    print(f"🔥 বট চালু হয়েছে — {WORKERS} টি ওয়ার্কার প্রসেস, শেয়ার করা SQLite ক্যাটালগ {CATALOG_DB_FILE}")
+    run_bot(application)
+
+
+# --- মাল্টি-প্রসেস মোড: ওয়ার্কার প্রসেস ---
+async def serve_worker(application: Application) -> None:
+    """ফ্রন্টের সকেট থেকে আপডেট নিয়ে সাধারণ হ্যান্ডলারগুলো চালায়; সকেট বন্ধ হলে বা SIGTERM এ থামে"""
+    loop = asyncio.get_running_loop()
+    stop_event = asyncio.Event()
+    loop.add_signal_handler(signal.SIGTERM, stop_event.set)
+    # Ctrl+C পুরো প্রসেস গ্রুপে যায়; ওয়ার্কার ফ্রন্টের কাছ থেকে বাকি আপডেট পাওয়ার পর সকেট বন্ধ হলে থামে
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    front = None
+
+    def on_open(writer):
+        nonlocal front
+        front = writer
+
+    async def enqueue(data):
+        # UPDATE_QUEUE_SIZE টি আপডেট চলমান থাকলে সকেট পড়া থেমে যায়; তখন ফ্রন্টে এই ওয়ার্কারের কিউ ভরে
+        # এবং নতুন আপডেট সাথে সাথে বাদ পড়ে (bot_dropped_updates_total এ গোনা হয়)
+        await application.update_queue.put(Update.de_json(data, application.bot))
+
+    # প্রতিটি আপডেট প্রসেস শেষে ফ্রন্টকে ack, যাতে ক্র্যাশে হারানো আপডেট গোনা যায়
+    application.update_queue.on_done = lambda: send_ack(front)
+
+    await application.initialize()
+    await on_startup(application)
+    await application.start()
+    server = await start_update_server(WORKER_SOCKET, enqueue, stop_event.set, on_open=on_open)
+    logger.info(f"ওয়ার্কার {WORKER_INDEX}/{WORKERS} চালু: {WORKER_SOCKET}")
+    try:
+        await stop_event.wait()
+    finally:
+        server.close()
+        # কিউতে থাকা আপডেটগুলো প্রসেস হওয়ার পর থামে; run_polling এর মতো একই ক্রমে হুক
+        await application.stop()
+        await on_stop(application)
+        await application.shutdown()
+        await on_shutdown(application)
 
+def run_worker() -> None:
+    init_services()
+    application = build_application(application_builder().updater(None))
+    asyncio.run(serve_worker(application))
 
-# --- মেইন ফাংশন ---
-def main() -> None:
-    """বট অ্যাপ্লিকেশন চালু করে"""
-    if not BOT_TOKEN or ADMIN_USER_ID == 0 or CHANNEL_ID == 0 or not AD_URL:
-        logger.error("🛑 গুরুতর কনফিগারেশন ত্রুটি: Environment Variables চেক করুন (BOT_TOKEN, ADMIN_USER_ID, CHANNEL_ID, AD_URL)।")
-        print("🛑 গুরুতর কনফিগারেশন ত্রুটি: Railway Variables চেক করুন।")
-        return
 
-    logging.getLogger('httpx').setLevel(logging.WARNING)
-    application = Application.builder().token(BOT_TOKEN).build()
+# --- মেইন ফাংশন ---
+def application_builder():
+    """BOT_API_BASE_URL দেওয়া থাকলে (লোকাল Bot API সার্ভার বা বেঞ্চমার্ক) সেটি ব্যবহার করে"""
+    builder = Application.builder()
+    if BOT_API_BASE_URL:
+        builder = builder.base_url(BOT_API_BASE_URL)
+    if BOT_API_BASE_FILE_URL:
+        builder = builder.base_file_url(BOT_API_BASE_FILE_URL)
+    return builder
+
+def init_services() -> None:
+    """ক্যাটালগ, লিংক ক্যাশ, ডিলিট কিউ, আপলোড সেশন, চ্যানেল পোস্ট ও অ্যানালিটিক্স স্টোর খোলে"""
+    global CATALOG, LINK_CACHE, LEGACY_CUTOFF
+    CATALOG = VideoCatalog(open_storage(CATALOG_BACKEND, DATA_FILE, CATALOG_DB_FILE), flush_interval=CATALOG_FLUSH_SECONDS)
+    LINK_CACHE = LinkCache(CATALOG, maxsize=LINK_CACHE_SIZE, ttl=LINK_CACHE_TTL)
+    LEGACY_CUTOFF = LEGACY_LINK_CUTOFF if LEGACY_LINK_CUTOFF is not None else CATALOG.ensure_legacy_cutoff()
+    logger.info(f"ক্যাটালগ লোড হলো ({CATALOG_BACKEND}): {len(CATALOG)} টি এন্ট্রি, legacy লিংক শুধু ID < {LEGACY_CUTOFF}")
+    DELETIONS.open()
+    SESSIONS.open()
+    CHANNEL_POSTS.open()
+    ANALYTICS.open()
+
+    # স্ক্রেপের সময় পড়া গেজ
+    SEND_QUEUE_DEPTH.set_function(SENDER.depth)
+    PENDING_DELETIONS.set_function(DELETIONS.depth)
+
+def build_application(builder=None) -> Application:
+    """অ্যাপ্লিকেশন তৈরি করে সব হ্যান্ডলার যুক্ত করে (বেঞ্চমার্ক নিজের base_url সহ builder দিতে পারে)"""
+    application = (
+        (builder or application_builder())
+        .token(BOT_TOKEN)
+        # কিউতে ও প্রসেসিংয়ে মোট আপডেট সীমিত: স্পাইকের সময় টাস্ক/মেমরি অসীমভাবে বাড়বে না
+        .update_queue(InFlightUpdateQueue(UPDATE_QUEUE_SIZE))
+        # ভিন্ন ইউজারের আপডেট প্যারালেল, একই ইউজারের (বিশেষত এডমিন আপলোড) আপডেট ক্রমানুসারে
+        .concurrent_updates(PerUserUpdateProcessor(
+            UPDATE_CONCURRENCY, UPDATE_QUEUE_SIZE,
+            max_pending_per_user=UPDATE_MAX_PENDING_PER_USER, exempt_keys=(ADMIN_USER_ID,),
+        ))
+        .post_init(on_startup)
+        # post_stop এ বট তখনও চালু, post_shutdown এ শুধু ফাইল/DB বন্ধ
+        .post_stop(on_stop)
+        .post_shutdown(on_shutdown)
+        .build()
+    )
+    UPDATES_IN_FLIGHT.set_function(application.update_queue.in_flight)
 
     # কমান্ড হ্যান্ডলার
     application.add_handler(CommandHandler("start", start_command))
     # /start_upload_N অথবা /start_upload কমান্ড হ্যান্ডেল করার জন্য regex ব্যবহার
-    application.add_handler(CommandHandler(re.compile(r"start_upload_\d+|start_upload"), start_upload_command))
+    # (CommandHandler শুধু নির্দিষ্ট কমান্ড নাম নেয়, তাই Regex ফিল্টার)
+    application.add_handler(MessageHandler(
+        filters.Regex(r"^/start_upload(_\d+)?(@\w+)?(\s|$)") & filters.User(ADMIN_USER_ID),
+        start_upload_command
+    ))
+    application.add_handler(CommandHandler("backfill", backfill_command, filters=filters.User(ADMIN_USER_ID)))
+    application.add_handler(CommandHandler("backfill_status", backfill_status_command, filters=filters.User(ADMIN_USER_ID)))
+    application.add_handler(CommandHandler("backfill_stop", backfill_stop_command, filters=filters.User(ADMIN_USER_ID)))
+    application.add_handler(CommandHandler("stats", stats_command, filters=filters.User(ADMIN_USER_ID)))
       
     # এডমিন মেসেজ হ্যান্ডলার
     # ফটো হ্যান্ডলার
@@ -402,9 +859,46 @@ def main() -> None:
         filters.VIDEO & filters.User(ADMIN_USER_ID) & (~filters.COMMAND), 
         handle_admin_video_upload
     ))  
+    return application
+
+def start_role() -> None:
+    """BOT_ROLE/WORKERS অনুযায়ী ওয়ার্কার, ফ্রন্ট অথবা একক প্রসেস চালায়"""
+    if IS_WORKER:
+        run_worker()
+        return
+    if WORKERS > 1 or BOT_ROLE == "front":
+        if CATALOG_BACKEND != "sqlite":
+            # JSON ক্যাটালগ প্রসেস-লোকাল; ওয়ার্কাররা একে অপরের আপলোড দেখতে পাবে না
+            logger.error("🛑 WORKERS > 1 এর জন্য CATALOG_BACKEND=sqlite দরকার।")
+            return
+        run_front()
+        return
 
-    print(f"🔥 বট চালু হয়েছে — এডমিন এখন /start_upload_N কমান্ড দিয়ে {AD_URL} এ অ্যাড দেখে মাল্টিপল ভিডিও আপলোড করতে পারবেন।")  
-    application.run_polling(poll_interval=3.0)
+    init_services()
+    application = build_application()
+
+    print(f"🔥 বট চালু হয়েছে — এডমিন এখন /start_upload_N কমান্ড দিয়ে {AD_URL} এ অ্যাড দেখে মাল্টিপল ভিডিও আপলোড করতে পারবেন।")  
+    run_bot(application)
+
+def main() -> None:
+    """বট অ্যাপ্লিকেশন চালু করে"""
+    if not BOT_TOKEN or ADMIN_USER_ID == 0 or CHANNEL_ID == 0 or not AD_URL:
+        logger.error("🛑 গুরুতর কনফিগারেশন ত্রুটি: Environment Variables চেক করুন (BOT_TOKEN, ADMIN_USER_ID, CHANNEL_ID, AD_URL)।")
+        print("🛑 গুরুতর কনফিগারেশন ত্রুটি: Railway Variables চেক করুন।")
+        return
+    if not LINK_SECRET:
+        logger.error("🛑 LINK_SECRET সেট করা নেই। চ্যানেলের লিংক এই সিক্রেটে সাইন হয়; একটি স্থায়ী র‍্যান্ডম মান দিন "
+                     "(আগে BOT_TOKEN থেকে তৈরি হত — পুরনো লিংক চালু রাখতে sha256(\"links:<BOT_TOKEN>\") এর hex মান দিন)।")
+        print("🛑 গুরুতর কনফিগারেশন ত্রুটি: LINK_SECRET সেট করুন।")
+        return
+
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    try:
+        start_role()
+    except CatalogLoadError as e:
+        # খালি ক্যাটালগে চালু হলে নতুন আপলোড আগের প্রকাশিত লিংকের ID পেত
+        logger.critical(f"🛑 {e}. ফাইলটি ঠিক বা ব্যাকআপ থেকে ফেরত না আনা পর্যন্ত বট চালু হবে না।")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,206 @@
+import asyncio
+import bisect
+import functools
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = ",".join(
+        f'{name}="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in pairs
+    )
+    return "{" + escaped + "}"
+
+
+# --- মেট্রিক টাইপ (prometheus_client এর খুব হালকা বিকল্প, হট পাথে শুধু dict আপডেট) ---
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def inc(self, *labelvalues, amount=1):
+        self.values[labelvalues] = self.values.get(labelvalues, 0) + amount
+
+    def get(self, *labelvalues):
+        return self.values.get(labelvalues, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        if not self.labelnames and not self.values:
+            lines.append(f"{self.name} 0")
+        for labelvalues, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value}")
+        return lines
+
+
+class Gauge:
+    """স্ক্রেপের সময় ফাংশন কল করে মান নেয় (কিউ ডেপথ ইত্যাদির জন্য)"""
+
+    def __init__(self, name, documentation, function=None):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+
+    def set_function(self, function):
+        self.function = function
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        if self.function is not None:
+            try:
+                lines.append(f"{self.name} {self.function()}")
+            except Exception as e:
+                logger.warning(f"গেজ {self.name} পড়তে ব্যর্থ: {e}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.series = {}  # labelvalues -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value, *labelvalues):
+        series = self.series.get(labelvalues)
+        if series is None:
+            series = self.series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labelvalues):
+        series = self.series.get(labelvalues)
+        return sum(series[:-1]) if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labelvalues, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, labelvalues, ("le", bound))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {series[-1]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Prometheus টেক্সট ফরম্যাট"""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# --- বটের মেট্রিক ---
+HANDLER_LATENCY = REGISTRY.register(Histogram(
+    "bot_handler_latency_seconds", "হ্যান্ডলার শেষ হতে লাগা সময়", ["handler"]))
+DELIVERIES = REGISTRY.register(Counter(
+    "bot_deliveries_total", "ইউজারকে পাঠানো ডেলিভারি (locked/unlocked/admin)", ["kind"]))
+DELIVERY_FAILURES = REGISTRY.register(Counter(
+    "bot_delivery_failures_total", "ব্যর্থ ডেলিভারি", ["kind"]))
+DELIVERY_REPLAYS = REGISTRY.register(Counter(
+    "bot_delivery_replays_total", "রিপিট ক্লিকে রিসেন্ডের বদলে আগের মেসেজের দিকে পয়েন্টার", ["kind"]))
+CATALOG_MISSES = REGISTRY.register(Counter(
+    "bot_catalog_misses_total", "ক্যাটালগে না পাওয়া পার্মানেন্ট ID"))
+INVALID_LINKS = REGISTRY.register(Counter(
+    "bot_invalid_links_total", "ডিকোড করা যায়নি এমন payload"))
+TELEGRAM_API_ERRORS = REGISTRY.register(Counter(
+    "bot_telegram_api_errors_total", "Bot API কলের ত্রুটি, টাইপ অনুযায়ী", ["error"]))
+DROPPED_UPDATES = REGISTRY.register(Counter(
+    "bot_dropped_updates_total", "প্রসেস না করে বাদ দেওয়া আপডেট, কারণ অনুযায়ী", ["reason"]))
+UPDATES_IN_FLIGHT = REGISTRY.register(Gauge(
+    "bot_updates_in_flight", "আপডেট কিউতে বা প্রসেসিংয়ে থাকা আপডেট"))
+WORKER_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "bot_worker_queue_depth", "ফ্রন্টে ওয়ার্কারে পাঠানোর অপেক্ষায় থাকা আপডেট"))
+SEND_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "bot_send_queue_depth", "সেন্ড শিডিউলারে অপেক্ষমাণ কল"))
+PENDING_DELETIONS = REGISTRY.register(Gauge(
+    "bot_pending_deletions", "ডিলিট কিউতে অপেক্ষমাণ মেসেজ"))
+LINK_CACHE_HITS = REGISTRY.register(Counter(
+    "bot_link_cache_hits_total", "হট-লিংক ক্যাশ hit"))
+LINK_CACHE_MISSES = REGISTRY.register(Counter(
+    "bot_link_cache_misses_total", "হট-লিংক ক্যাশ miss"))
+
+
+def timed(handler_name):
+    """async হ্যান্ডলারের লেটেন্সি HANDLER_LATENCY তে রেকর্ড করে"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                HANDLER_LATENCY.observe(time.perf_counter() - started, handler_name)
+        return wrapper
+    return decorator
+
+
+# --- লোকাল /metrics HTTP এন্ডপয়েন্ট ---
+class MetricsServer:
+    """ন্যূনতম HTTP সার্ভার: GET /metrics এ Prometheus টেক্সট দেয়"""
+
+    def __init__(self, host, port, registry=REGISTRY):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._server = None
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # বাকি হেডারগুলো পড়ে ফেলা
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=5)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", self.registry.render().encode("utf-8")
+            else:
+                status, body = "404 Not Found", b"not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        logger.info(f"মেট্রিক এন্ডপয়েন্ট চালু: http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
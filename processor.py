@@ -0,0 +1,117 @@
+import asyncio
+import logging
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from metrics import DROPPED_UPDATES
+
+logger = logging.getLogger(__name__)
+
+
+# --- আপডেট কিউ: মোট চলমান+অপেক্ষমাণ আপডেট সীমিত ---
+class InFlightUpdateQueue(asyncio.Queue):
+    """put() অপেক্ষা করে যতক্ষণ limit টি আপডেট কিউতে বা প্রসেসিংয়ে আছে
+
+    কনকারেন্ট মোডে PTB কিউ থেকে আপডেট নিয়েই টাস্ক বানায়, তাই সাধারণ maxsize কিছু আটকায় না।
+    PTB প্রতিটি আপডেট প্রসেস শেষে task_done() ডাকে; তখনই স্লট ছাড়া হয়, ফলে ব্যাকপ্রেশার
+    সরাসরি আপডেটার (polling/webhook) বা ওয়ার্কার সকেটে পৌঁছায়। on_done থাকলে প্রতিটি আপডেট শেষে ডাকা হয়
+    (ওয়ার্কার এভাবে ফ্রন্টকে ack পাঠায়)।
+    """
+
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+        self.on_done = None
+        self._in_flight = 0
+        self._slot_free = asyncio.Event()
+
+    def in_flight(self):
+        return self._in_flight
+
+    def put_nowait(self, item):
+        if self._in_flight >= self.limit:
+            raise asyncio.QueueFull
+        self._in_flight += 1
+        super().put_nowait(item)
+
+    async def put(self, item):
+        while self._in_flight >= self.limit:
+            self._slot_free.clear()
+            await self._slot_free.wait()
+        self.put_nowait(item)
+
+    def task_done(self):
+        super().task_done()
+        self._in_flight -= 1
+        self._slot_free.set()
+        if self.on_done is not None:
+            self.on_done()
+
+
+# --- ইউজার-ভিত্তিক ক্রম বজায় রেখে কনকারেন্ট আপডেট প্রসেসিং ---
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """ভিন্ন ইউজারের আপডেট একসাথে চলে, কিন্তু একই ইউজারের আপডেট আসার ক্রমে একটির পর একটি চলে
+
+    কোনো গ্লোবাল সীমা ইউজার-লকের আগে নেওয়া হয় না: একজন ইউজারের জমে থাকা আপডেট শুধু তার নিজের
+    লকে অপেক্ষা করে। এক ইউজারের অপেক্ষমাণ আপডেট max_pending_per_user ছাড়ালে বাকিগুলো বাদ পড়ে
+    (exempt_keys ছাড়া, যেমন এডমিন আপলোড), যাতে সে InFlightUpdateQueue এর পুরো সীমা দখল করতে না পারে।
+    """
+
+    def __init__(self, max_concurrent_updates, max_pending_updates, max_pending_per_user=16, exempt_keys=()):
+        # বেস ক্লাসের সেমাফোর ইউজার-লকের আগে নেওয়া হয়, তাই এটি কিউয়ের সীমার সমান রাখা হয় যাতে কখনও আটকে না যায়;
+        # মোট আপডেট সীমিত রাখে InFlightUpdateQueue
+        super().__init__(max(max_pending_updates, max_concurrent_updates, 2))
+        self.concurrency = max_concurrent_updates
+        self.max_pending_per_user = max_pending_per_user
+        self.exempt_keys = frozenset(exempt_keys)
+        self.dropped = 0
+        self._slots = asyncio.Semaphore(max_concurrent_updates)
+        self._user_locks = {}  # key -> [lock, অপেক্ষমাণ আপডেট সংখ্যা]
+
+    @staticmethod
+    def _ordering_key(update):
+        if isinstance(update, Update):
+            if update.effective_user is not None:
+                return update.effective_user.id
+            if update.effective_chat is not None:
+                return update.effective_chat.id
+        return None
+
+    def pending_users(self):
+        """যেসব ইউজারের আপডেট এখন চলছে বা অপেক্ষায় আছে তাদের সংখ্যা"""
+        return len(self._user_locks)
+
+    async def do_process_update(self, update, coroutine):
+        key = self._ordering_key(update)
+        if key is None:
+            async with self._slots:
+                await coroutine
+            return
+
+        entry = self._user_locks.get(key)
+        if entry is None:
+            entry = self._user_locks[key] = [asyncio.Lock(), 0]
+        elif entry[1] >= self.max_pending_per_user and key not in self.exempt_keys:
+            # স্প্যাম বা রিপিট-ক্লিক ঝড়: আগেরগুলো শেষ হওয়ার আগে নতুনগুলো বাদ
+            coroutine.close()
+            self.dropped += 1
+            DROPPED_UPDATES.inc("user_backlog")
+            logger.debug(f"ইউজার {key} এর অপেক্ষমাণ আপডেট সীমা ছাড়িয়েছে, আপডেট বাদ দেওয়া হলো")
+            return
+        entry[1] += 1
+        try:
+            # asyncio.Lock FIFO ক্রমে অপেক্ষমাণদের ছাড়ে, তাই একই ইউজারের আপডেট ক্রমানুসারে চলে
+            async with entry[0]:
+                async with self._slots:
+                    await coroutine
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._user_locks[key]
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
@@ -0,0 +1,195 @@
+import asyncio
+import itertools
+import logging
+import time
+
+from telegram.error import BadRequest, NetworkError, RetryAfter, TimedOut
+
+from metrics import TELEGRAM_API_ERRORS
+
+logger = logging.getLogger(__name__)
+
+# --- প্রায়োরিটি লেন (ছোট সংখ্যা আগে যাবে) ---
+PRIORITY_USER = 0     # ইউজারের ভিডিও ডেলিভারি
+PRIORITY_CHANNEL = 1  # চ্যানেল পোস্ট
+PRIORITY_DELETE = 2   # শিডিউলড ডিলিট
+PRIORITY_BACKFILL = 3 # বাল্ক রিপোস্ট/এডিট জব
+
+
+def retry_after_seconds(error):
+    """RetryAfter এর অপেক্ষার সময় সেকেন্ডে (int বা timedelta দুটোই সামলায়)"""
+    value = error.retry_after
+    return value.total_seconds() if hasattr(value, "total_seconds") else float(value)
+
+
+# --- টোকেন বাকেট ---
+class TokenBucket:
+    """গ্লোবাল রেট লিমিট: প্রতি সেকেন্ডে rate টি টোকেন, সর্বোচ্চ capacity পর্যন্ত জমা থাকে"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def pause(self, seconds):
+        """RetryAfter পেলে পুরো বাকেট কিছুক্ষণ বন্ধ থাকে"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class _SendJob:
+    __slots__ = ("priority", "seq", "chat_id", "func", "args", "kwargs", "future", "attempts")
+
+    def __init__(self, priority, seq, chat_id, func, args, kwargs, future):
+        self.priority = priority
+        self.seq = seq
+        self.chat_id = chat_id
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future = future
+        self.attempts = 0
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+# --- সেন্ড শিডিউলার ---
+class SendScheduler:
+    """সব আউটবাউন্ড Bot API কল এক কিউ দিয়ে যায়: গ্লোবাল রেট, চ্যাট-ভিত্তিক পেসিং, প্রায়োরিটি ও retry_after ব্যাকঅফ"""
+
+    def __init__(self, rate=30.0, private_chat_interval=0.3, group_chat_interval=3.0, workers=16, max_retries=5):
+        self.bucket = TokenBucket(rate)
+        self.private_chat_interval = private_chat_interval
+        self.group_chat_interval = group_chat_interval
+        self.workers = workers
+        self.max_retries = max_retries
+        self.queue = None
+        self._seq = itertools.count()
+        self._chat_next_at = {}
+        self._worker_tasks = []
+        self._stopping = False
+
+    def depth(self):
+        """কিউতে অপেক্ষমাণ কলের সংখ্যা"""
+        return self.queue.qsize() if self.queue is not None else 0
+
+    def _chat_interval(self, chat_id):
+        # নেগেটিভ ID মানে গ্রুপ/চ্যানেল, যেখানে Telegram এর লিমিট অনেক কম
+        return self.group_chat_interval if chat_id is not None and chat_id < 0 else self.private_chat_interval
+
+    def submit(self, priority, chat_id, func, /, *args, **kwargs):
+        """কলটি কিউতে রেখে একটি future ফেরত দেয়, যা Bot API এর ফলাফল বা ত্রুটি পাবে"""
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait(_SendJob(priority, next(self._seq), chat_id, func, args, kwargs, future))
+        return future
+
+    async def run(self, priority, chat_id, func, /, *args, **kwargs):
+        """submit করে ফলাফলের জন্য অপেক্ষা করে"""
+        return await self.submit(priority, chat_id, func, *args, **kwargs)
+
+    async def _wait_for_chat(self, chat_id):
+        interval = self._chat_interval(chat_id)
+        if not interval:
+            return
+        now = time.monotonic()
+        # আগে থেকেই স্লট রিজার্ভ করা হয়, যাতে একই চ্যাটের একাধিক কল ঠিকমতো ফাঁক রেখে যায়
+        start_at = max(now, self._chat_next_at.get(chat_id, 0.0))
+        self._chat_next_at[chat_id] = start_at + interval
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+        if len(self._chat_next_at) > 10000:
+            self._chat_next_at = {key: value for key, value in self._chat_next_at.items() if value > now}
+
+    async def _execute(self, job):
+        await self._wait_for_chat(job.chat_id)
+        await self.bucket.acquire()
+        try:
+            result = await job.func(*job.args, **job.kwargs)
+        except Exception as e:
+            TELEGRAM_API_ERRORS.inc(type(e).__name__)
+            self._handle_failure(job, e)
+            if isinstance(e, NetworkError):
+                await asyncio.sleep(min(2 ** job.attempts, 30))
+            self.queue.put_nowait(job)
+            return
+        if not job.future.done():
+            job.future.set_result(result)
+
+    def _handle_failure(self, job, e):
+        """আবার চেষ্টা করা যাবে কিনা ঠিক করে; না গেলে ত্রুটিটি আবার raise করে"""
+        if isinstance(e, RetryAfter):
+            wait = retry_after_seconds(e)
+            job.attempts += 1
+            if job.attempts > self.max_retries:
+                raise e
+            logger.warning(f"ফ্লাড লিমিট (429): {wait} সেকেন্ড পর আবার চেষ্টা হবে, Chat ID {job.chat_id}")
+            # পুরো বাকেট থামে; একই seq রেখে আবার কিউতে যায়, যাতে লেনের ভেতরে ক্রম ঠিক থাকে
+            self.bucket.pause(wait)
+            return
+        if isinstance(e, TimedOut):
+            # রিড টাইমআউটে মেসেজ হয়তো পৌঁছে গেছে; আবার পাঠালে ডুপ্লিকেট হতে পারে
+            raise e
+        if isinstance(e, BadRequest):
+            # PTB তে BadRequest ও NetworkError এর সাবক্লাস, কিন্তু আবার পাঠালেও একই ফল হবে
+            raise e
+        if isinstance(e, NetworkError):
+            job.attempts += 1
+            # বন্ধ হওয়ার সময় ব্যাকঅফে অপেক্ষা করলে ড্রেইন শেষ হয় না
+            if job.attempts > self.max_retries or self._stopping:
+                raise e
+            logger.warning(f"নেটওয়ার্ক ত্রুটি ({e}), আবার চেষ্টা হবে: Chat ID {job.chat_id}")
+            return
+        raise e
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                if job.future.cancelled():
+                    continue
+                await self._execute(job)
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    job.future.cancel()
+                raise
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    async def start(self):
+        self._stopping = False
+        self.queue = asyncio.PriorityQueue()
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self, drain_timeout=10.0):
+        """বাকি কলগুলো শেষ হওয়ার জন্য কিছুক্ষণ অপেক্ষা করে ওয়ার্কার বন্ধ করে; এরপর নেটওয়ার্ক ত্রুটি আর রিট্রাই হয় না"""
+        self._stopping = True
+        if self.queue is not None and self._worker_tasks:
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"সেন্ড কিউ পুরোপুরি খালি হয়নি: {self.depth()} টি কল বাদ পড়ল")
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
@@ -0,0 +1,109 @@
+import asyncio
+import json
+import logging
+import time
+
+from storage import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+SESSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS upload_sessions (
+    user_id INTEGER PRIMARY KEY,
+    data TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+# --- স্থায়ী আপলোড সেশন ---
+class UploadSessionStore:
+    """এডমিনের চলমান /start_upload সেশন ডিস্কে রাখে, যাতে রিডিপ্লয়ে থাম্বনেইল/ভিডিও হারিয়ে না যায়"""
+
+    def __init__(self, path, ttl=24 * 3600):
+        self.path = path
+        self.ttl = ttl  # শেষ আপডেটের এত সেকেন্ড পর সেশন বাতিল
+        self.conn = None
+
+    def open(self):
+        self.conn = connect_sqlite(self.path)
+        self.conn.executescript(SESSION_SCHEMA)
+        expired = self.conn.execute("DELETE FROM upload_sessions WHERE expires_at <= ?", (time.time(),)).rowcount
+        if expired:
+            logger.info(f"{expired} টি মেয়াদোত্তীর্ণ আপলোড সেশন মুছে ফেলা হলো")
+        active = self.conn.execute("SELECT COUNT(*) FROM upload_sessions").fetchone()[0]
+        if active:
+            logger.info(f"আগের আপলোড সেশন পাওয়া গেছে: {active} টি")
+        return self
+
+    def get(self, user_id):
+        """চলমান সেশনের dict, না থাকলে বা মেয়াদ শেষ হলে None"""
+        row = self.conn.execute(
+            "SELECT data FROM upload_sessions WHERE user_id = ? AND expires_at > ?", (user_id, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, user_id, data):
+        """সেশন লিখে রাখে এবং মেয়াদ নতুন করে গণনা শুরু করে"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO upload_sessions (user_id, data, expires_at) VALUES (?, ?, ?)",
+            (user_id, json.dumps(data, ensure_ascii=False), time.time() + self.ttl),
+        )
+
+    def delete(self, user_id):
+        self.conn.execute("DELETE FROM upload_sessions WHERE user_id = ?", (user_id,))
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+# --- অ্যালবাম (media_group_id) সংগ্রহ ---
+class AlbumCollector:
+    """একই media_group_id এর অংশগুলো জমা করে; debounce সেকেন্ড নতুন অংশ না এলে একবারে on_flush ডাকে"""
+
+    def __init__(self, on_flush, debounce=1.5):
+        self.on_flush = on_flush  # async (user_id, items)
+        self.debounce = debounce
+        self._albums = {}  # (user_id, media_group_id) -> [items]
+        self._timers = {}
+        self._tasks = set()
+
+    def add(self, user_id, media_group_id, item):
+        key = (user_id, media_group_id)
+        self._albums.setdefault(key, []).append(item)
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        self._timers[key] = asyncio.get_running_loop().call_later(self.debounce, self._spawn_flush, key)
+
+    def _spawn_flush(self, key):
+        task = asyncio.create_task(self._flush(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, key):
+        self._timers.pop(key, None)
+        items = self._albums.pop(key, None)
+        if not items:
+            return
+        try:
+            await self.on_flush(key[0], items)
+        except Exception as e:
+            logger.error(f"অ্যালবাম প্রসেস করতে ব্যর্থ (media_group_id {key[1]}): {e}")
+
+    async def flush_user(self, user_id):
+        """ইউজারের অপেক্ষমাণ অ্যালবামগুলো এখনই প্রসেস করে (পরের একক মেসেজের আগে ক্রম ঠিক রাখতে)"""
+        for key in [key for key in self._albums if key[0] == user_id]:
+            timer = self._timers.pop(key, None)
+            if timer is not None:
+                timer.cancel()
+            await self._flush(key)
+
+    async def flush_all(self):
+        for user_id in {key[0] for key in self._albums}:
+            await self.flush_user(user_id)
+
+    def pending(self):
+        return sum(len(items) for items in self._albums.values())
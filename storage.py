@@ -0,0 +1,333 @@
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogLoadError(RuntimeError):
+    """ক্যাটালগ পড়া যায়নি; খালি ক্যাটালগে চালু হলে next_id আবার ১ থেকে শুরু হয়ে প্রকাশিত লিংকের ID দখল করত"""
+
+
+# --- রেকর্ড নরমালাইজেশন ---
+def normalize_record(record):
+    """পুরনো {"video_id": ...} রেকর্ডকে বর্তমান {"video_ids": [...]} আকারে আনে"""
+    if not isinstance(record, dict):
+        return None
+    video_ids = record.get("video_ids")
+    if not video_ids and record.get("video_id"):
+        video_ids = [record["video_id"]]
+    if not video_ids:
+        return None
+    return {"video_ids": list(video_ids), "photo_id": record.get("photo_id")}
+
+
+# --- অ্যাটমিক ফাইল রাইট ---
+def atomic_write_json(path, data):
+    """একই ফোল্ডারে টেম্প ফাইলে লিখে os.replace দিয়ে বদলায়, যাতে মাঝপথে ক্র্যাশ হলেও পুরনো ফাইল অক্ষত থাকে"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+# --- স্টোরেজ ইন্টারফেস ---
+class CatalogStorage:
+    """ক্যাটালগ স্টোরেজের সাধারণ ইন্টারফেস; VideoCatalog শুধু এই মেথডগুলো ব্যবহার করে"""
+
+    def load(self):
+        return self
+
+    def get(self, permanent_id):
+        raise NotImplementedError
+
+    def add(self, record):
+        """রেকর্ড যোগ করে নতুন পার্মানেন্ট ID ফেরত দেয়"""
+        raise NotImplementedError
+
+    def count(self):
+        raise NotImplementedError
+
+    def iter_records(self, after_id=0, batch_size=500):
+        """ID ক্রমানুসারে (permanent_id, record) দেয়, পুরো ক্যাটালগ একসাথে মেমরিতে না এনে"""
+        raise NotImplementedError
+
+    def ensure_legacy_cutoff(self):
+        """সাইনবিহীন লিংকের সীমা: প্রথমবার ডাকার সময়ের next_id স্থায়ীভাবে রাখে এবং সেটিই ফেরত দেয়
+
+        এর সমান বা বড় ID সাইন করা লিংক চালুর পরে তৈরি, তাই সেগুলোর সাইনবিহীন লিংক কখনও প্রকাশিত হয়নি।
+        """
+        raise NotImplementedError
+
+    def prepare_flush(self):
+        """ডিস্কে লেখার বাকি থাকলে একটি কলেবল ফেরত দেয় যা থ্রেডে চালানো যায়, নাহলে None"""
+        return None
+
+    def close(self):
+        pass
+
+
+# --- JSON স্টোরেজ ---
+class JsonStorage(CatalogStorage):
+    """পুরো ক্যাটালগ মেমরিতে রাখে এবং ব্যাচে একটি JSON ফাইলে অ্যাটমিকভাবে লেখে"""
+
+    def __init__(self, path):
+        self.path = path
+        self.videos = {}
+        self.next_id = 1
+        self.legacy_cutoff = None
+        self._version = 0
+        self._flushed_version = 0
+
+    def load(self):
+        """ডিস্ক থেকে ক্যাটালগ লোড করে। নষ্ট ফাইল হলে চালু হতে অস্বীকার করে; ফাইলটি যেখানে আছে সেখানেই থাকে।"""
+        self.videos, self.next_id, self.legacy_cutoff = {}, 1, None
+        if not os.path.exists(self.path):
+            return self
+        try:
+            data = read_json_catalog(self.path)
+        except (json.JSONDecodeError, IOError, ValueError, AttributeError) as e:
+            raise CatalogLoadError(f"ক্যাটালগ ফাইল {self.path} পড়া যায়নি: {e}") from e
+        self.videos = data["videos"]
+        self.next_id = data["next_id"]
+        self.legacy_cutoff = data["legacy_cutoff"]
+        return self
+
+    def get(self, permanent_id):
+        return self.videos.get(str(permanent_id))
+
+    def add(self, record):
+        permanent_id = self.next_id
+        self.videos[str(permanent_id)] = record
+        self.next_id += 1
+        self._version += 1
+        return permanent_id
+
+    def count(self):
+        return len(self.videos)
+
+    def ensure_legacy_cutoff(self):
+        if self.legacy_cutoff is None:
+            self.legacy_cutoff = self.next_id
+            self._version += 1
+        return self.legacy_cutoff
+
+    def iter_records(self, after_id=0, batch_size=500):
+        ids = sorted(int(key) for key in self.videos if int(key) > after_id)
+        for permanent_id in ids:
+            record = self.videos.get(str(permanent_id))
+            if record is not None:
+                yield permanent_id, record
+
+    def prepare_flush(self):
+        if self._version == self._flushed_version:
+            return None
+        # রেকর্ডগুলো একবার লেখার পর আর বদলায় না, তাই শ্যালো কপিই যথেষ্ট
+        version = self._version
+        snapshot = {"videos": dict(self.videos), "next_id": self.next_id}
+        if self.legacy_cutoff is not None:
+            snapshot["legacy_cutoff"] = self.legacy_cutoff
+
+        def write():
+            atomic_write_json(self.path, snapshot)
+            self._flushed_version = max(self._flushed_version, version)
+        return write
+
+
+# --- SQLite (WAL) স্টোরেজ ---
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    id INTEGER PRIMARY KEY,
+    photo_id TEXT,
+    video_ids TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO counters (name, value) VALUES ('next_id', 1);
+"""
+
+
+def connect_sqlite(path):
+    """WAL মোডে SQLite কানেকশন খোলে (একাধিক রিডার, একজন রাইটার)"""
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+class SqliteStorage(CatalogStorage):
+    """প্রতিটি লুকআপ প্রাইমারি-কী পয়েন্ট রিড, প্রতিটি আপলোড একটি ছোট ট্রানজ্যাকশন"""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = None
+
+    def load(self):
+        self.conn = connect_sqlite(self.path)
+        self.conn.executescript(SQLITE_SCHEMA)
+        return self
+
+    @staticmethod
+    def _row_to_record(row):
+        return {"video_ids": json.loads(row[1]), "photo_id": row[0]}
+
+    def get(self, permanent_id):
+        try:
+            key = int(permanent_id)
+        except (TypeError, ValueError):
+            return None
+        row = self.conn.execute("SELECT photo_id, video_ids FROM videos WHERE id = ?", (key,)).fetchone()
+        return self._row_to_record(row) if row else None
+
+    def add(self, record):
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # next_id বরাদ্দ একটি সিঙ্গেল-রো অ্যাটমিক আপডেট
+            (permanent_id,) = conn.execute(
+                "UPDATE counters SET value = value + 1 WHERE name = 'next_id' RETURNING value - 1"
+            ).fetchone()
+            conn.execute(
+                "INSERT INTO videos (id, photo_id, video_ids, created_at) VALUES (?, ?, ?, ?)",
+                (permanent_id, record.get("photo_id"), json.dumps(record["video_ids"]), time.time()),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return permanent_id
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+    @property
+    def next_id(self):
+        return self.conn.execute("SELECT value FROM counters WHERE name = 'next_id'").fetchone()[0]
+
+    def ensure_legacy_cutoff(self):
+        # INSERT OR IGNORE: একাধিক ওয়ার্কার একসাথে চালু হলেও প্রথম মানটিই থাকে
+        self.conn.execute(
+            "INSERT OR IGNORE INTO counters (name, value) "
+            "SELECT 'legacy_cutoff', value FROM counters WHERE name = 'next_id'"
+        )
+        return self.conn.execute("SELECT value FROM counters WHERE name = 'legacy_cutoff'").fetchone()[0]
+
+    def iter_records(self, after_id=0, batch_size=500):
+        last_id = after_id
+        while True:
+            rows = self.conn.execute(
+                "SELECT id, photo_id, video_ids FROM videos WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size),
+            ).fetchall()
+            if not rows:
+                return
+            for permanent_id, photo_id, video_ids in rows:
+                yield permanent_id, self._row_to_record((photo_id, video_ids))
+            last_id = rows[-1][0]
+
+    def import_records(self, records, next_id, legacy_cutoff=None):
+        """আগের ID ঠিক রেখে রেকর্ড ইমপোর্ট করে; আবার চালালেও ডুপ্লিকেট হয় না"""
+        conn = self.conn
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            imported = 0
+            for permanent_id, record in records:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO videos (id, photo_id, video_ids, created_at) VALUES (?, ?, ?, ?)",
+                    (permanent_id, record.get("photo_id"), json.dumps(record["video_ids"]), now),
+                )
+                imported += cursor.rowcount
+            conn.execute(
+                "UPDATE counters SET value = MAX(value, ?, (SELECT COALESCE(MAX(id), 0) + 1 FROM videos)) "
+                "WHERE name = 'next_id'",
+                (next_id,),
+            )
+            if legacy_cutoff is not None:
+                conn.execute("INSERT OR IGNORE INTO counters (name, value) VALUES ('legacy_cutoff', ?)", (legacy_cutoff,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return imported
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+# --- JSON থেকে ইমপোর্ট ---
+def read_json_catalog(path):
+    """video_data.json পড়ে দুই ধরনের রেকর্ডই (video_id / video_ids) নরমালাইজ করে ফেরত দেয়"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    videos = {}
+    raw_videos = data.get("videos", {})
+    for key, record in raw_videos.items():
+        normalized = normalize_record(record)
+        if normalized is None:
+            logger.warning(f"অবৈধ রেকর্ড বাদ দেওয়া হলো: ID {key}")
+            continue
+        videos[str(int(key))] = normalized
+    # বাদ পড়া রেকর্ডের ID-ও আর পুনরায় ব্যবহার হবে না
+    max_id = max((int(key) for key in raw_videos), default=0)
+    next_id = max(int(data.get("next_id", 1)), max_id + 1)
+    legacy_cutoff = data.get("legacy_cutoff")
+    return {"videos": videos, "next_id": next_id, "legacy_cutoff": int(legacy_cutoff) if legacy_cutoff is not None else None}
+
+
+def import_json_catalog(json_path, storage):
+    """একবারের মাইগ্রেশন: পুরনো JSON ক্যাটালগ SQLite স্টোরেজে কপি করে"""
+    data = read_json_catalog(json_path)
+    records = sorted(((int(key), record) for key, record in data["videos"].items()), key=lambda item: item[0])
+    imported = storage.import_records(records, data["next_id"], data["legacy_cutoff"])
+    logger.info(f"JSON থেকে ইমপোর্ট সম্পন্ন: {imported} টি নতুন রেকর্ড ({json_path} -> {storage.path})")
+    return imported
+
+
+def open_storage(backend, json_path, sqlite_path):
+    """কনফিগারেশন অনুযায়ী স্টোরেজ খোলে; SQLite খালি থাকলে পুরনো JSON থেকে স্বয়ংক্রিয় ইমপোর্ট করে"""
+    if backend == "json":
+        return JsonStorage(json_path).load()
+    if backend != "sqlite":
+        raise ValueError(f"অজানা ক্যাটালগ ব্যাকএন্ড: {backend}")
+    storage = SqliteStorage(sqlite_path).load()
+    if storage.count() == 0 and os.path.exists(json_path):
+        try:
+            import_json_catalog(json_path, storage)
+        except (json.JSONDecodeError, IOError, ValueError, AttributeError) as e:
+            # খালি SQLite নিয়ে চালু হলে পুরনো JSON এর প্রকাশিত ID আবার বরাদ্দ হতো
+            storage.close()
+            raise CatalogLoadError(f"JSON ক্যাটালগ {json_path} ইমপোর্ট করা যায়নি: {e}") from e
+    return storage
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
+    if len(sys.argv) != 3:
+        print("ব্যবহার: python storage.py <video_data.json> <video_data.db>")
+        sys.exit(1)
+    target = SqliteStorage(sys.argv[2]).load()
+    import_json_catalog(sys.argv[1], target)
+    print(f"মোট রেকর্ড: {target.count()}, next_id: {target.next_id}")
+    target.close()
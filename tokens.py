@@ -0,0 +1,118 @@
+import base64
+import hashlib
+import hmac
+import struct
+import time
+
+# --- অ্যাকশন ---
+ACTION_VIEW = 0    # লকড অবস্থায় দেখানো (চ্যানেলের "ভিডিও দেখুন" লিংক)
+ACTION_UNLOCK = 1  # অ্যাড দেখে ফিরে আসা
+
+# এসব অ্যাকশনের টোকেন একজন ইউজারের জন্য সাইন করা হয়; user_id টোকেনে থাকে না, শুধু MAC এর ইনপুটে
+USER_BOUND_ACTIONS = frozenset({ACTION_UNLOCK})
+
+TOKEN_VERSION = 1
+_FLAG_EXPIRES = 0x08
+_ACTION_MASK = 0x07
+MAC_SIZE = 8  # HMAC-SHA256 এর প্রথম ৮ বাইট (৬৪ বিট)
+MAX_TOKEN_LENGTH = 64  # Telegram এর start প্যারামিটারের সীমা
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+def _encode_varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _decode_varint(data, offset):
+    value = shift = 0
+    while offset < len(data):
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+        if shift > 35:
+            break
+    raise InvalidToken("varint")
+
+
+# --- সাইন করা deep-link টোকেন ---
+class LinkTokenCodec:
+    """(action, permanent_id, ঐচ্ছিক মেয়াদ) কে ছোট বাইনারি টোকেনে প্যাক করে truncated HMAC দিয়ে সাইন করে
+
+    লেআউট: হেডার (version << 4 | flags | action) + varint ID + [u32 মেয়াদ] + MAC, base64url (প্যাডিং ছাড়া)।
+    USER_BOUND_ACTIONS এর টোকেনে MAC user_id সহ হিসাব হয়, তাই অন্য ইউজার একই টোকেন ব্যবহার করতে পারে না
+    এবং টোকেনের দৈর্ঘ্যও বাড়ে না।
+    """
+
+    def __init__(self, secret):
+        self.key = secret.encode("utf-8") if isinstance(secret, str) else secret
+
+    def _mac(self, body, user_id=None):
+        if user_id is not None:
+            body += struct.pack(">q", int(user_id))
+        return hmac.new(self.key, body, hashlib.sha256).digest()[:MAC_SIZE]
+
+    def encode(self, action, permanent_id, expires_at=None, user_id=None):
+        if action in USER_BOUND_ACTIONS and user_id is None:
+            raise ValueError("এই অ্যাকশনের টোকেনের জন্য user_id দরকার")
+        header = TOKEN_VERSION << 4 | (action & _ACTION_MASK)
+        body = bytearray()
+        if expires_at is not None:
+            header |= _FLAG_EXPIRES
+        body.append(header)
+        body += _encode_varint(int(permanent_id))
+        if expires_at is not None:
+            body += struct.pack(">I", int(expires_at))
+        body += self._mac(bytes(body), user_id if action in USER_BOUND_ACTIONS else None)
+        return base64.urlsafe_b64encode(bytes(body)).decode("ascii").rstrip("=")
+
+    def decode(self, token, user_id=None):
+        """(action, permanent_id, expires_at) ফেরত দেয়; সাইন না মিললে (বা অন্য ইউজারের টোকেন হলে) InvalidToken
+
+        মেয়াদ পার হয়েছে কিনা কলার দেখে, যাতে পুরনো আনলক লিংক লকড অবস্থায় ফিরতে পারে।
+        """
+        if not token or len(token) > MAX_TOKEN_LENGTH:
+            raise InvalidToken("length")
+        try:
+            data = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        except ValueError:
+            raise InvalidToken("encoding") from None
+        if len(data) < 2 + MAC_SIZE or data[0] >> 4 != TOKEN_VERSION:
+            raise InvalidToken("format")
+        body, mac = data[:-MAC_SIZE], data[-MAC_SIZE:]
+        header = body[0]
+        if (header & _ACTION_MASK) in USER_BOUND_ACTIONS:
+            if user_id is None:
+                raise InvalidToken("user")
+            expected = self._mac(body, user_id)
+        else:
+            expected = self._mac(body)
+        if not hmac.compare_digest(mac, expected):
+            raise InvalidToken("signature")
+
+        permanent_id, offset = _decode_varint(body, 1)
+        expires_at = None
+        if header & _FLAG_EXPIRES:
+            if len(body) - offset != 4:
+                raise InvalidToken("format")
+            expires_at = struct.unpack_from(">I", body, offset)[0]
+        elif offset != len(body):
+            raise InvalidToken("format")
+        return header & _ACTION_MASK, permanent_id, expires_at
+
+    @staticmethod
+    def expired(expires_at, now=None):
+        return expires_at is not None and expires_at < (now if now is not None else time.time())
@@ -0,0 +1,234 @@
+import asyncio
+import json
+import logging
+import os
+import subprocess
+
+from metrics import DROPPED_UPDATES
+
+logger = logging.getLogger(__name__)
+
+LINE_LIMIT = 4 * 1024 * 1024  # একটি আপডেটের JSON লাইনের সর্বোচ্চ আকার
+ACK = b"\n"  # ওয়ার্কার প্রতিটি আপডেট প্রসেস শেষে ফ্রন্টকে এক বাইট ফেরত পাঠায়
+
+
+def worker_for(key, count):
+    """একই ইউজার সবসময় একই ওয়ার্কারে যায়, তাই তার আপডেটের ক্রম ও প্রসেস-লোকাল ক্যাশ ঠিক থাকে"""
+    return key % count
+
+
+# --- ফ্রন্ট প্রসেস: ওয়ার্কার চালানো ও আপডেট বণ্টন ---
+class WorkerPool:
+    """count টি ওয়ার্কার সাবপ্রসেস চালায় এবং প্রতিটির Unix সকেটে লাইন-ভিত্তিক JSON আপডেট পাঠায়
+
+    প্রতিটি ওয়ার্কারের নিজস্ব সীমিত কিউ ও রাইটার টাস্ক আছে, তাই একটি ধীর বা বন্ধ ওয়ার্কার অন্যদের আটকায় না।
+    কিউ ভরা থাকলে dispatch অপেক্ষা না করে সাথে সাথেই আপডেট বাদ দেয়। ওয়ার্কার ক্র্যাশ করলে যেসব আপডেট পাঠানো হয়েছিল কিন্তু ack আসেনি সেগুলো হারানো হিসেবে গোনা হয়।
+    """
+
+    def __init__(self, count, socket_dir, command, env=None, queue_size=1000):
+        self.count = count
+        self.socket_dir = socket_dir
+        self.command = command  # ওয়ার্কার চালানোর কমান্ড (যেমন [python, main.py])
+        self.env = env
+        self.queue_size = queue_size
+        self.processes = [None] * count
+        self.writers = [None] * count
+        self.queues = []
+        self.sent = [0] * count  # বর্তমান কানেকশনে লেখা আপডেট
+        self.acked = [0] * count  # তার মধ্যে ওয়ার্কার যতগুলো প্রসেস শেষ করেছে
+        self.drops = [0] * count  # কিউ ভরা থাকার সময় বাদ পড়া আপডেট (লগ শুরুতে ও শেষে একবার)
+        self._connected = []
+        self._ack_tasks = [None] * count
+        self._writer_tasks = []
+        self._monitor_task = None
+
+    def socket_path(self, index):
+        return os.path.join(self.socket_dir, f"worker-{index}.sock")
+
+    def depth(self):
+        """সব ওয়ার্কারের কিউতে অপেক্ষমাণ আপডেট"""
+        return sum(queue.qsize() for queue in self.queues)
+
+    def _spawn(self, index):
+        path = self.socket_path(index)
+        if os.path.exists(path):
+            os.unlink(path)
+        env = dict(self.env if self.env is not None else os.environ)
+        env.update(BOT_ROLE="worker", WORKERS=str(self.count), WORKER_INDEX=str(index), WORKER_SOCKET=path)
+        self.processes[index] = subprocess.Popen(self.command, env=env)
+
+    async def _connect(self, index, timeout=60.0):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            process = self.processes[index]
+            if process.poll() is not None:
+                raise RuntimeError(f"ওয়ার্কার {index} চালু হতে ব্যর্থ (exit {process.returncode})")
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.socket_path(index))
+            except (FileNotFoundError, ConnectionRefusedError):
+                if loop.time() > deadline:
+                    raise
+                await asyncio.sleep(0.1)
+                continue
+            self.sent[index] = self.acked[index] = 0
+            self.writers[index] = writer
+            self._ack_tasks[index] = asyncio.create_task(self._ack_loop(index, reader))
+            self._connected[index].set()
+            return
+
+    async def _ack_loop(self, index, reader):
+        while True:
+            data = await reader.read(4096)
+            if not data:
+                return
+            self.acked[index] += data.count(ACK)
+
+    async def _writer_loop(self, index):
+        queue = self.queues[index]
+        while True:
+            line = await queue.get()
+            try:
+                await self._connected[index].wait()
+                writer = self.writers[index]
+                self.sent[index] += 1
+                writer.write(line)
+                await writer.drain()
+            except ConnectionError as e:
+                # এই আপডেটসহ ack না আসা সবগুলো ওয়ার্কার রিস্টার্টের সময় হারানো হিসেবে গোনা হবে
+                logger.warning(f"ওয়ার্কার {index} এর সাথে সংযোগ বিচ্ছিন্ন: {e}")
+                self._disconnect(index)
+            finally:
+                queue.task_done()
+
+    def _disconnect(self, index):
+        self._connected[index].clear()
+        writer, self.writers[index] = self.writers[index], None
+        if writer is not None:
+            writer.close()
+
+    async def _count_lost(self, index):
+        """মৃত ওয়ার্কারে পাঠানো কিন্তু প্রসেস না হওয়া আপডেট লগ ও গণনা করে"""
+        ack_task, self._ack_tasks[index] = self._ack_tasks[index], None
+        if ack_task is not None:
+            # সকেটে থাকা শেষ ack গুলো পড়ে নেওয়া
+            await asyncio.wait([ack_task], timeout=1.0)
+            ack_task.cancel()
+        lost = self.sent[index] - self.acked[index]
+        if lost > 0:
+            logger.error(f"ওয়ার্কার {index} ক্র্যাশে {lost} টি আপডেট প্রসেস না হয়ে হারিয়ে গেছে")
+            DROPPED_UPDATES.inc("worker_crashed", amount=lost)
+        self.sent[index] = self.acked[index] = 0
+
+    async def start(self):
+        os.makedirs(self.socket_dir, exist_ok=True)
+        self.queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(self.count)]
+        self._connected = [asyncio.Event() for _ in range(self.count)]
+        for index in range(self.count):
+            self._spawn(index)
+        await asyncio.gather(*(self._connect(index) for index in range(self.count)))
+        self._writer_tasks = [asyncio.create_task(self._writer_loop(index)) for index in range(self.count)]
+        self._monitor_task = asyncio.create_task(self._monitor_loop())
+        logger.info(f"{self.count} টি ওয়ার্কার চালু হয়েছে: {self.socket_dir}")
+
+    async def _monitor_loop(self):
+        while True:
+            await asyncio.sleep(1.0)
+            for index, process in enumerate(self.processes):
+                if process.poll() is None:
+                    continue
+                logger.error(f"ওয়ার্কার {index} বন্ধ হয়ে গেছে (exit {process.returncode}), আবার চালু হচ্ছে")
+                self._disconnect(index)
+                await self._count_lost(index)
+                self._spawn(index)
+                try:
+                    await self._connect(index)
+                except Exception as e:
+                    logger.error(f"ওয়ার্কার {index} আবার চালু করা যায়নি: {e}")
+
+    def dispatch(self, key, payload):
+        """আপডেট (dict) key অনুযায়ী ওয়ার্কারের কিউতে রাখে; কিউ ভরা থাকলে অপেক্ষা না করে বাদ দিয়ে False ফেরত দেয়
+
+        ফ্রন্ট আপডেট একটির পর একটি ফরোয়ার্ড করে, তাই এখানে অপেক্ষা করলে সব ওয়ার্কারের আপডেট আটকে যেত।
+        """
+        index = worker_for(key, self.count)
+        line = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+        try:
+            self.queues[index].put_nowait(line)
+        except asyncio.QueueFull:
+            reason = "worker_queue_full" if self._connected[index].is_set() else "worker_unavailable"
+            DROPPED_UPDATES.inc(reason)
+            if not self.drops[index]:
+                logger.warning(f"ওয়ার্কার {index} এর কিউ ভরা ({reason}), কিউতে জায়গা না হওয়া পর্যন্ত তার আপডেট বাদ দেওয়া হবে")
+            self.drops[index] += 1
+            return False
+        if self.drops[index]:
+            logger.warning(f"ওয়ার্কার {index} এর কিউ ভরা থাকায় {self.drops[index]} টি আপডেট বাদ পড়েছে")
+            self.drops[index] = 0
+        return True
+
+    async def stop(self, timeout=30.0):
+        """কিউতে থাকা আপডেট পাঠিয়ে সকেট বন্ধ করে (ওয়ার্কার বাকি কাজ শেষ করে বের হয়), দেরি হলে terminate"""
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            await asyncio.gather(self._monitor_task, return_exceptions=True)
+            self._monitor_task = None
+        pending = [queue.join() for index, queue in enumerate(self.queues) if self._connected[index].is_set()]
+        if pending:
+            try:
+                await asyncio.wait_for(asyncio.gather(*pending), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"ওয়ার্কার কিউতে {self.depth()} টি আপডেট পাঠানো যায়নি")
+        for task in self._writer_tasks + [task for task in self._ack_tasks if task is not None]:
+            task.cancel()
+        await asyncio.gather(*self._writer_tasks, return_exceptions=True)
+        self._writer_tasks = []
+        self._ack_tasks = [None] * self.count
+        for index in range(self.count):
+            self._disconnect(index)
+        for index, process in enumerate(self.processes):
+            if process is None:
+                continue
+            try:
+                await asyncio.wait_for(asyncio.to_thread(process.wait), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"ওয়ার্কার {index} সময়মতো বন্ধ হয়নি, terminate করা হচ্ছে")
+                process.terminate()
+                await asyncio.to_thread(process.wait)
+
+
+# --- ওয়ার্কার প্রসেস: ফ্রন্ট থেকে আপডেট গ্রহণ ---
+async def start_update_server(socket_path, handle, on_close, on_open=None):
+    """প্রতিটি লাইনের JSON আপডেট handle(dict) এ দেয়; ফ্রন্টের কানেকশন খুললে on_open(writer), বন্ধ হলে on_close ডাকে"""
+
+    async def on_connection(reader, writer):
+        if on_open is not None:
+            on_open(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ConnectionError:
+                    break
+                if not line:
+                    break
+                try:
+                    data = json.loads(line)
+                except ValueError as e:
+                    logger.warning(f"অবৈধ আপডেট লাইন বাদ দেওয়া হলো: {e}")
+                    send_ack(writer)
+                    continue
+                await handle(data)
+        finally:
+            writer.close()
+            on_close()
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    return await asyncio.start_unix_server(on_connection, path=socket_path, limit=LINE_LIMIT)
+
+
+def send_ack(writer):
+    """ওয়ার্কার একটি আপডেট প্রসেস শেষ করেছে তা ফ্রন্টকে জানায়"""
+    if writer is not None and not writer.is_closing():
+        writer.write(ACK)